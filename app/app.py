@@ -1,10 +1,13 @@
 import reflex as rx
+from reflex.config import get_config
+from reflex.model import get_engine as get_reflex_engine
 import logging
 import os
 import bcrypt
 from datetime import datetime, timedelta
-from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel import Session, select
 from app.models import User, Billing, Revenue, Document, ChatMessage
+from app.db import apply_statement_timeout, create_db_engine
 from app.pages.landing import landing_page
 from app.pages.auth import login_page, register_page
 from app.pages.dashboard import dashboard_page
@@ -26,6 +29,10 @@ from app.pages.profile import profile_page
 from app.pages.admin import admin_page
 from app.pages.health import health_page
 from app.utils.logger import setup_logging
+from app.scripts.migrate import apply_migrations
+from app.services.revenue import rebuild_rollups
+from app.services.search import ensure_search_index
+from app.services.vector_index import ensure_vector_index
 
 setup_logging()
 
@@ -39,8 +46,10 @@ def init_db():
     database_url = os.getenv("DATABASE_URL", "sqlite:///reflex.db")
     logging.info(f"Initializing database at {database_url}...")
     try:
-        engine = create_engine(database_url)
-        SQLModel.metadata.create_all(engine)
+        engine = create_db_engine(database_url)
+        apply_migrations(engine)
+        ensure_search_index(engine)
+        ensure_vector_index(engine)
         logging.info("Database tables created successfully.")
         with Session(engine) as session:
             try:
@@ -92,33 +101,25 @@ def init_db():
                         "amount": 2500.0,
                         "description": "Consulting Services - Project A",
                         "category": "Service",
-                        "date": (datetime.now() - timedelta(days=5)).strftime(
-                            "%Y-%m-%d"
-                        ),
+                        "date": (datetime.now() - timedelta(days=5)).date(),
                     },
                     {
                         "amount": 1800.0,
                         "description": "Web Development",
                         "category": "Service",
-                        "date": (datetime.now() - timedelta(days=15)).strftime(
-                            "%Y-%m-%d"
-                        ),
+                        "date": (datetime.now() - timedelta(days=15)).date(),
                     },
                     {
                         "amount": 450.0,
                         "description": "Product Sales",
                         "category": "Product Sale",
-                        "date": (datetime.now() - timedelta(days=20)).strftime(
-                            "%Y-%m-%d"
-                        ),
+                        "date": (datetime.now() - timedelta(days=20)).date(),
                     },
                     {
                         "amount": 3000.0,
                         "description": "Monthly Retainer",
                         "category": "Service",
-                        "date": (datetime.now() - timedelta(days=35)).strftime(
-                            "%Y-%m-%d"
-                        ),
+                        "date": (datetime.now() - timedelta(days=35)).date(),
                     },
                 ]
                 for rev in revenues:
@@ -130,6 +131,7 @@ def init_db():
                         date=rev["date"],
                     )
                     session.add(revenue_entry)
+                rebuild_rollups(session, test_user.id)
                 session.commit()
                 logging.info("Database seeded successfully.")
             else:
@@ -158,4 +160,6 @@ app.add_page(admin_page, route="/dashboard/admin", title="Admin - Fiscal Assista
 app.add_page(
     health_page, route="/dashboard/health", title="System Health - Fiscal Assistant"
 )
-init_db()
\ No newline at end of file
+init_db()
+if get_config().db_url:
+    apply_statement_timeout(get_reflex_engine())
\ No newline at end of file
@@ -1,7 +1,19 @@
 from celery import Celery
+from celery.signals import worker_process_init
+from kombu import Queue
 import os
+from app.db import reset_engine
 
 redis_url = f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', '6379')}/0"
+CELERY_OCR_SOFT_TIME_LIMIT = int(os.getenv("CELERY_OCR_SOFT_TIME_LIMIT", "600"))
+CELERY_OCR_TIME_LIMIT = int(os.getenv("CELERY_OCR_TIME_LIMIT", "660"))
+CELERY_SOFT_TIME_LIMIT = int(os.getenv("CELERY_SOFT_TIME_LIMIT", "120"))
+CELERY_TIME_LIMIT = int(os.getenv("CELERY_TIME_LIMIT", "150"))
+CELERY_OCR_SWEEP_SECONDS = int(os.getenv("CELERY_OCR_SWEEP_SECONDS", "300"))
+CELERY_MAX_TASKS_PER_CHILD = int(os.getenv("CELERY_MAX_TASKS_PER_CHILD", "50"))
+CELERY_MAX_MEMORY_PER_CHILD_KB = int(
+    os.getenv("CELERY_MAX_MEMORY_PER_CHILD_KB", "1048576")
+)
 celery_app = Celery(
     "fiscal_assistant", broker=redis_url, backend=redis_url, include=["app.tasks"]
 )
@@ -11,4 +23,37 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
-)
\ No newline at end of file
+    task_queues=(Queue("ocr"), Queue("embeddings"), Queue("maintenance")),
+    task_default_queue="maintenance",
+    task_routes={
+        "app.tasks.process_document_ocr": {"queue": "ocr"},
+        "app.tasks.process_documents_ocr_batch": {"queue": "ocr"},
+        "app.tasks.embed_document_chunks": {"queue": "embeddings"},
+        "app.tasks.summarize_conversation": {"queue": "maintenance"},
+        "app.tasks.requeue_stale_documents": {"queue": "maintenance"},
+    },
+    beat_schedule={
+        "requeue-stale-documents": {
+            "task": "app.tasks.requeue_stale_documents",
+            "schedule": CELERY_OCR_SWEEP_SECONDS,
+        }
+    },
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_soft_time_limit=CELERY_SOFT_TIME_LIMIT,
+    task_time_limit=CELERY_TIME_LIMIT,
+    task_annotations={
+        "app.tasks.process_document_ocr": {
+            "soft_time_limit": CELERY_OCR_SOFT_TIME_LIMIT,
+            "time_limit": CELERY_OCR_TIME_LIMIT,
+        },
+        "app.tasks.process_documents_ocr_batch": {
+            "soft_time_limit": CELERY_OCR_SOFT_TIME_LIMIT,
+            "time_limit": CELERY_OCR_TIME_LIMIT,
+        },
+    },
+    worker_max_tasks_per_child=CELERY_MAX_TASKS_PER_CHILD,
+    worker_max_memory_per_child=CELERY_MAX_MEMORY_PER_CHILD_KB,
+    broker_transport_options={"visibility_timeout": CELERY_OCR_TIME_LIMIT * 2},
+)
+worker_process_init.connect(reset_engine)
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlmodel import create_engine
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///reflex.db")
+DB_POOL_SIZE = int(os.getenv("SQLALCHEMY_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("SQLALCHEMY_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("SQLALCHEMY_POOL_PRE_PING", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+DB_POOL_RECYCLE = int(os.getenv("SQLALCHEMY_POOL_RECYCLE", "-1"))
+DB_POOL_TIMEOUT = float(os.getenv("SQLALCHEMY_POOL_TIMEOUT", "30"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _uses_queue_pool(url) -> bool:
+    """In-memory SQLite gets a singleton/static pool, which takes no sizing options."""
+    if url.get_backend_name() != "sqlite":
+        return True
+    return url.database not in (None, "", ":memory:") and (
+        url.query.get("mode") != "memory"
+    )
+
+
+def engine_options(database_url: str) -> dict:
+    """Pool and connection arguments for an engine on the given URL.
+
+    Pool settings use the same SQLALCHEMY_* variables Reflex reads for
+    ``rx.session()``, so one set of values sizes every pool in the stack.
+    """
+    url = make_url(database_url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if _uses_queue_pool(url):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+def _set_statement_timeout(dbapi_connection, connection_record):
+    autocommit = dbapi_connection.autocommit
+    dbapi_connection.autocommit = True
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"SET statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+    cursor.close()
+    dbapi_connection.autocommit = autocommit
+
+
+def apply_statement_timeout(engine):
+    """Set DB_STATEMENT_TIMEOUT_MS on every new PostgreSQL connection of an engine.
+
+    Done with a connect hook so it also covers engines built elsewhere, such
+    as the one Reflex creates for ``rx.session()``.
+    """
+    if engine.dialect.name != "postgresql" or DB_STATEMENT_TIMEOUT_MS <= 0:
+        return
+    if not event.contains(engine, "connect", _set_statement_timeout):
+        event.listen(engine, "connect", _set_statement_timeout)
+
+
+def create_db_engine(database_url: str = DATABASE_URL):
+    """Create a new pooled engine, e.g. for a one-off script."""
+    engine = create_engine(database_url, **engine_options(database_url))
+    apply_statement_timeout(engine)
+    return engine
+
+
+def get_engine():
+    """Return the process-wide engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_db_engine()
+    return _engine
+
+
+def reset_engine(**kwargs):
+    """Drop pooled connections inherited from a parent process after fork.
+
+    The parent's connections are left open for the parent to keep using;
+    the child simply starts with an empty pool.
+    """
+    if _engine is not None:
+        _engine.dispose(close=False)
\ No newline at end of file
@@ -1,13 +1,14 @@
 import reflex as rx
 from sqlmodel import SQLModel, Field
-from datetime import datetime
+from sqlalchemy import Index
+from datetime import datetime, date
 
 
 class User(SQLModel, table=True):
     """User model for authentication and profile."""
 
     id: int | None = Field(default=None, primary_key=True)
-    email: str
+    email: str = Field(index=True, unique=True)
     password_hash: str
     full_name: str
     cnpj: str = ""
@@ -19,7 +20,7 @@ class Billing(SQLModel, table=True):
     """Billing model for tracking usage."""
 
     id: int | None = Field(default=None, primary_key=True)
-    user_id: int
+    user_id: int = Field(index=True, unique=True)
     current_month_tokens: int = 0
     total_tokens: int = 0
     plan_type: str = "free"
@@ -29,18 +30,44 @@ class Billing(SQLModel, table=True):
 class Revenue(SQLModel, table=True):
     """Revenue model for tracking income."""
 
+    __table_args__ = (
+        Index("ix_revenue_user_id_date", "user_id", "date"),
+        Index("ix_revenue_user_id_import_hash", "user_id", "import_hash", unique=True),
+    )
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     amount: float
     description: str
     category: str
-    date: str
+    date: date
+    import_hash: str | None = Field(default=None, sa_column_kwargs={"nullable": True})
     created_at: datetime = Field(default_factory=datetime.now)
 
 
+class RevenueMonthlyRollup(SQLModel, table=True):
+    """Per-user monthly revenue totals maintained on every revenue write."""
+
+    __table_args__ = (
+        Index(
+            "ix_revenuemonthlyrollup_user_id_year_month",
+            "user_id",
+            "year",
+            "month",
+            unique=True,
+        ),
+    )
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    year: int
+    month: int
+    total: float = 0.0
+    count: int = 0
+
+
 class Document(SQLModel, table=True):
     """Document model for stored files and OCR data."""
 
+    __table_args__ = (Index("ix_document_user_id_created_at", "user_id", "created_at"),)
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     filename: str
@@ -51,15 +78,49 @@ class Document(SQLModel, table=True):
     extracted_text: str | None = Field(
         default=None, sa_column_kwargs={"nullable": True}
     )
+    content_hash: str | None = Field(
+        default=None, index=True, sa_column_kwargs={"nullable": True}
+    )
+    claimed_at: datetime | None = Field(
+        default=None, sa_column_kwargs={"nullable": True}
+    )
+    ocr_attempts: int | None = Field(default=0, sa_column_kwargs={"nullable": True})
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class DocumentChunk(SQLModel, table=True):
+    """Overlapping slice of a document's extracted text used for retrieval."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    document_id: int = Field(foreign_key="document.id", index=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    chunk_index: int
+    start_offset: int
+    end_offset: int
+    content: str = Field(sa_column_kwargs={"nullable": False})
+    embedding: bytes | None = Field(default=None, sa_column_kwargs={"nullable": True})
     created_at: datetime = Field(default_factory=datetime.now)
 
 
 class ChatMessage(SQLModel, table=True):
     """Model for storing chat history."""
 
+    __table_args__ = (
+        Index("ix_chatmessage_user_id_created_at", "user_id", "created_at"),
+    )
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     role: str
     content: str = Field(sa_column_kwargs={"nullable": False})
     tokens_used: int = 0
-    created_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class ConversationSummary(SQLModel, table=True):
+    """Rolling summary of a user's chat turns that fell out of the memory window."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True, unique=True)
+    summary: str = ""
+    last_message_id: int = 0
+    updated_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
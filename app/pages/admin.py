@@ -85,7 +85,13 @@ def admin_content() -> rx.Component:
                 "bar-chart-3",
                 "emerald",
             ),
-            class_name="grid md:grid-cols-3 gap-6 mb-8",
+            admin_stat_card(
+                "Answer Cache Hit Rate",
+                f"{AdminState.cache_hit_rate:.1f}% ({AdminState.cache_hits} hits)",
+                "zap",
+                "yellow",
+            ),
+            class_name="grid md:grid-cols-2 lg:grid-cols-4 gap-6 mb-8",
         ),
         rx.el.div(
             rx.el.h3(
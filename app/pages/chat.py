@@ -60,6 +60,15 @@ def chat_interface() -> rx.Component:
         ),
         rx.el.div(
             rx.el.div(
+                rx.cond(
+                    ChatState.has_older_messages,
+                    rx.el.button(
+                        "Load earlier messages",
+                        on_click=ChatState.load_older_messages,
+                        class_name="mx-auto block text-xs font-medium text-emerald-600 hover:text-emerald-700 mb-2",
+                    ),
+                    rx.fragment(),
+                ),
                 rx.cond(
                     ChatState.messages,
                     rx.foreach(ChatState.messages, message_bubble),
@@ -97,6 +106,15 @@ def chat_interface() -> rx.Component:
                     ),
                     rx.fragment(),
                 ),
+                rx.cond(
+                    ChatState.has_newer_messages,
+                    rx.el.button(
+                        "Show newer messages",
+                        on_click=ChatState.load_newer_messages,
+                        class_name="mx-auto block text-xs font-medium text-emerald-600 hover:text-emerald-700 mt-2",
+                    ),
+                    rx.fragment(),
+                ),
                 id="chat-container",
                 class_name="flex-1 overflow-y-auto p-4 space-y-4 min-h-0",
             ),
@@ -111,7 +129,7 @@ def chat_interface() -> rx.Component:
                         rx.el.button(
                             rx.icon("send-horizontal", class_name="h-5 w-5"),
                             type="submit",
-                            disabled=ChatState.is_loading,
+                            disabled=ChatState.is_loading | ChatState.is_streaming,
                             class_name="p-3 rounded-lg bg-emerald-600 text-white hover:bg-emerald-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors shadow-sm",
                         ),
                         class_name="flex gap-2",
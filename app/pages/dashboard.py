@@ -178,6 +178,80 @@ def add_revenue_modal() -> rx.Component:
     )
 
 
+def import_revenue_modal() -> rx.Component:
+    return rx.dialog.root(
+        rx.dialog.trigger(
+            rx.el.button(
+                rx.icon("file-up", class_name="h-4 w-4 mr-2"),
+                "Import Statement",
+                class_name="flex items-center px-4 py-2 text-sm font-medium text-gray-700 border border-gray-200 rounded-lg hover:bg-gray-50 transition-colors",
+            )
+        ),
+        rx.dialog.content(
+            rx.dialog.title(
+                "Import Bank Statement",
+                class_name="text-lg font-bold text-gray-900 mb-2",
+            ),
+            rx.el.p(
+                "Credits from CSV or OFX statements are added as revenue. Entries that were already imported are skipped.",
+                class_name="text-sm text-gray-500 mb-4",
+            ),
+            rx.upload.root(
+                rx.el.div(
+                    rx.icon("cloud-upload", class_name="h-8 w-8 text-emerald-500 mb-2"),
+                    rx.el.p(
+                        "Drag & drop a .csv or .ofx file here",
+                        class_name="text-sm font-medium text-gray-700",
+                    ),
+                    class_name="flex flex-col items-center justify-center p-6 border-2 border-dashed border-emerald-100 rounded-xl bg-emerald-50/30 hover:bg-emerald-50 transition-colors cursor-pointer",
+                ),
+                id=DashboardState.import_upload_id,
+                accept={
+                    "text/csv": [".csv"],
+                    "application/x-ofx": [".ofx", ".qfx"],
+                },
+                max_files=5,
+                class_name="w-full",
+            ),
+            rx.el.div(
+                rx.foreach(
+                    rx.selected_files(DashboardState.import_upload_id),
+                    lambda file: rx.el.div(
+                        rx.icon("file", class_name="h-4 w-4 text-emerald-600"),
+                        rx.el.span(file, class_name="text-sm text-gray-600 truncate"),
+                        class_name="flex items-center gap-2 p-2 bg-white border border-gray-100 rounded-lg shadow-sm",
+                    ),
+                ),
+                class_name="grid grid-cols-1 gap-2 mt-4",
+            ),
+            rx.el.div(
+                rx.dialog.close(
+                    rx.el.button(
+                        "Cancel",
+                        class_name="px-4 py-2 text-sm font-medium text-gray-700 hover:bg-gray-50 rounded-lg mr-2",
+                    )
+                ),
+                rx.el.button(
+                    rx.cond(
+                        DashboardState.is_importing,
+                        rx.icon("loader", class_name="h-4 w-4 animate-spin"),
+                        rx.fragment("Import"),
+                    ),
+                    on_click=DashboardState.handle_revenue_import(
+                        rx.upload_files(upload_id=DashboardState.import_upload_id)
+                    ),
+                    disabled=DashboardState.is_importing,
+                    class_name="px-4 py-2 text-sm font-medium text-white bg-emerald-600 hover:bg-emerald-700 rounded-lg disabled:opacity-50",
+                ),
+                class_name="flex justify-end mt-6",
+            ),
+            class_name="bg-white p-6 rounded-xl shadow-xl max-w-md w-full",
+        ),
+        open=DashboardState.is_import_modal_open,
+        on_open_change=DashboardState.set_import_modal_open,
+    )
+
+
 def revenue_table_row(revenue: dict) -> rx.Component:
     return rx.el.tr(
         rx.el.td(
@@ -208,15 +282,100 @@ def revenue_table_row(revenue: dict) -> rx.Component:
     )
 
 
+def sortable_header(label: str, column: str) -> rx.Component:
+    return rx.el.th(
+        rx.el.button(
+            label,
+            rx.cond(
+                DashboardState.sort_by == column,
+                rx.icon(
+                    rx.cond(DashboardState.sort_desc, "chevron-down", "chevron-up"),
+                    class_name="h-3 w-3 ml-1",
+                ),
+                rx.fragment(),
+            ),
+            on_click=DashboardState.sort_revenue(column),
+            class_name="flex items-center uppercase tracking-wider hover:text-gray-700",
+        ),
+        class_name="px-6 py-3 text-left text-xs font-medium text-gray-500",
+    )
+
+
+def revenue_filters() -> rx.Component:
+    input_class = "rounded-lg border-gray-300 border p-2 text-sm focus:border-emerald-500 focus:ring-emerald-500"
+    return rx.el.div(
+        rx.el.input(
+            type="date",
+            value=DashboardState.filter_start_date,
+            on_change=DashboardState.set_filter_start_date,
+            class_name=input_class,
+        ),
+        rx.el.span("to", class_name="text-sm text-gray-400"),
+        rx.el.input(
+            type="date",
+            value=DashboardState.filter_end_date,
+            on_change=DashboardState.set_filter_end_date,
+            class_name=input_class,
+        ),
+        rx.el.select(
+            rx.el.option("All categories", value=""),
+            rx.el.option("Service", value="Service"),
+            rx.el.option("Product Sale", value="Product Sale"),
+            rx.el.option("Consulting", value="Consulting"),
+            rx.el.option("Other", value="Other"),
+            value=DashboardState.filter_category,
+            on_change=DashboardState.set_filter_category,
+            class_name=input_class,
+        ),
+        rx.el.button(
+            "Clear",
+            on_click=DashboardState.clear_filters,
+            class_name="px-3 py-2 text-sm font-medium text-gray-600 hover:bg-gray-50 rounded-lg",
+        ),
+        class_name="flex flex-wrap items-center gap-2 mb-4",
+    )
+
+
+def revenue_pagination() -> rx.Component:
+    button_class = "px-3 py-1.5 text-sm font-medium text-gray-700 border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+    return rx.el.div(
+        rx.el.span(
+            f"{DashboardState.total_entries} entries - page {DashboardState.page} of {DashboardState.total_pages}",
+            class_name="text-sm text-gray-500",
+        ),
+        rx.el.div(
+            rx.el.button(
+                "Previous",
+                on_click=DashboardState.prev_page,
+                disabled=DashboardState.page <= 1,
+                class_name=button_class,
+            ),
+            rx.el.button(
+                "Next",
+                on_click=DashboardState.next_page,
+                disabled=DashboardState.page >= DashboardState.total_pages,
+                class_name=button_class,
+            ),
+            class_name="flex gap-2",
+        ),
+        class_name="flex items-center justify-between mt-4",
+    )
+
+
 def revenue_history_table() -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.h3(
                 "Recent Transactions", class_name="text-lg font-bold text-gray-900"
             ),
-            add_revenue_modal(),
+            rx.el.div(
+                import_revenue_modal(),
+                add_revenue_modal(),
+                class_name="flex items-center gap-2",
+            ),
             class_name="flex items-center justify-between mb-6",
         ),
+        revenue_filters(),
         rx.el.div(
             rx.el.table(
                 rx.el.thead(
@@ -225,14 +384,8 @@ def revenue_history_table() -> rx.Component:
                             "Description",
                             class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
                         ),
-                        rx.el.th(
-                            "Date",
-                            class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
-                        ),
-                        rx.el.th(
-                            "Amount",
-                            class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
-                        ),
+                        sortable_header("Date", "date"),
+                        sortable_header("Amount", "amount"),
                         rx.el.th(
                             "",
                             class_name="px-6 py-3 text-right text-xs font-medium text-gray-500 uppercase tracking-wider",
@@ -248,6 +401,7 @@ def revenue_history_table() -> rx.Component:
             ),
             class_name="overflow-hidden rounded-lg border border-gray-200",
         ),
+        revenue_pagination(),
         class_name="p-6 bg-white rounded-xl border border-gray-100 shadow-sm mt-8",
     )
 
@@ -95,7 +95,16 @@ def document_row(doc: dict) -> rx.Component:
     return rx.el.tr(
         rx.el.td(
             rx.el.div(
-                rx.icon("file-text", class_name="h-5 w-5 text-gray-400 mr-3"),
+                rx.cond(
+                    doc.content_type.contains("image")
+                    & DocumentState.preview_urls.contains(doc.minio_path),
+                    rx.el.img(
+                        src=DocumentState.preview_urls[doc.minio_path],
+                        loading="lazy",
+                        class_name="h-8 w-8 rounded object-cover border border-gray-200 mr-3",
+                    ),
+                    rx.icon("file-text", class_name="h-5 w-5 text-gray-400 mr-3"),
+                ),
                 rx.el.span(
                     doc.filename, class_name="text-sm font-medium text-gray-900"
                 ),
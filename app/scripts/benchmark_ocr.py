@@ -0,0 +1,99 @@
+import argparse
+import difflib
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+import pytesseract
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+from app.services.ocr import ocr_image
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+
+def generate_fixtures(directory: Path, count: int):
+    """Write synthetic phone-photo receipts (12 MP JPEG, skewed, noisy) with ground truth."""
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(0)
+    font = ImageFont.load_default(size=72)
+    for i in range(count):
+        lines = [
+            f"NOTA FISCAL {rng.randint(1000, 9999)}",
+            f"CNPJ {rng.randint(10, 99)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}/0001-{rng.randint(10, 99)}",
+            f"Servico de consultoria {rng.choice(['mensal', 'avulso', 'anual'])}",
+            f"Valor total R$ {rng.randint(100, 9999)},{rng.randint(10, 99)}",
+            f"Emitido em {rng.randint(10, 28)}/{rng.randint(10, 12)}/2025",
+        ]
+        image = Image.new("RGB", (4032, 3024), (rng.randint(200, 235),) * 3)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines):
+            draw.text((300, 400 + row * 220), line, fill=(30, 30, 30), font=font)
+        image = image.rotate(
+            rng.uniform(-3, 3), expand=False, fillcolor=(220, 220, 220)
+        )
+        image = image.filter(ImageFilter.GaussianBlur(1.2))
+        image.save(directory / f"fixture_{i:02d}.jpg", "JPEG", quality=85)
+        (directory / f"fixture_{i:02d}.txt").write_text("\n".join(lines))
+    logger.info(f"Wrote {count} fixtures to {directory}.")
+
+
+def _accuracy(expected: str, actual: str) -> float:
+    return difflib.SequenceMatcher(None, expected.split(), actual.split()).ratio()
+
+
+def _run(path: Path, preprocess: bool) -> tuple[float, str]:
+    start = time.perf_counter()
+    with Image.open(path) as image:
+        if preprocess:
+            text = ocr_image(image, preprocess=True)
+        else:
+            text = pytesseract.image_to_string(image)
+    return time.perf_counter() - start, text
+
+
+def main():
+    """Compare OCR time and word accuracy with and without image preprocessing."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "fixtures", type=Path, help="directory of images and .txt truths"
+    )
+    parser.add_argument(
+        "--generate",
+        type=int,
+        default=0,
+        metavar="N",
+        help="first write N synthetic fixtures into the directory",
+    )
+    args = parser.parse_args()
+    if args.generate:
+        generate_fixtures(args.fixtures, args.generate)
+    paths = sorted(
+        (p for p in args.fixtures.glob("*") if p.suffix.lower() in IMAGE_SUFFIXES)
+    )
+    if not paths:
+        logger.error(f"No fixture images found in {args.fixtures}.")
+        sys.exit(1)
+    totals = {False: [0.0, 0.0], True: [0.0, 0.0]}
+    for path in paths:
+        truth_path = path.with_suffix(".txt")
+        truth = truth_path.read_text() if truth_path.exists() else ""
+        results = []
+        for preprocess in (False, True):
+            elapsed, text = _run(path, preprocess)
+            accuracy = _accuracy(truth, text) if truth else 0.0
+            totals[preprocess][0] += elapsed
+            totals[preprocess][1] += accuracy
+            results.append(f"{elapsed:6.2f}s {accuracy:6.1%}")
+        logger.info(f"{path.name:30} raw {results[0]} | preprocessed {results[1]}")
+    for preprocess, label in ((False, "raw"), (True, "preprocessed")):
+        elapsed, accuracy = totals[preprocess]
+        logger.info(
+            f"{label:>12}: total {elapsed:.2f}s, mean accuracy {accuracy / len(paths):.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
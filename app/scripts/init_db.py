@@ -1,8 +1,11 @@
 import logging
 import os
 import sys
-from sqlmodel import SQLModel, create_engine
+from app.db import create_db_engine
 from app.models import *
+from app.scripts.migrate import apply_migrations
+from app.services.search import ensure_search_index
+from app.services.vector_index import ensure_vector_index
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,9 +19,11 @@ def init_db():
         sys.exit(1)
     logger.info(f"Connecting to database...")
     try:
-        engine = create_engine(database_url)
+        engine = create_db_engine(database_url)
         logger.info("Creating tables...")
-        SQLModel.metadata.create_all(engine)
+        apply_migrations(engine)
+        ensure_search_index(engine)
+        ensure_vector_index(engine)
         logger.info("Database initialization completed successfully.")
     except Exception as e:
         logger.exception(f"Failed to initialize database: {e}")
@@ -0,0 +1,124 @@
+import logging
+import os
+import sys
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, Session, select
+from app.db import create_db_engine
+from app.models import *
+from app.services.revenue import rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+
+def _merge_duplicate_billing(conn):
+    """Fold duplicate Billing rows into the oldest row per user."""
+    duplicates = conn.execute(
+        text(
+            "SELECT user_id, MIN(id), SUM(current_month_tokens), SUM(total_tokens) FROM billing GROUP BY user_id HAVING COUNT(*) > 1"
+        )
+    ).all()
+    for user_id, keep_id, current_month_tokens, total_tokens in duplicates:
+        conn.execute(
+            text(
+                "UPDATE billing SET current_month_tokens = :current, total_tokens = :total WHERE id = :id"
+            ),
+            {"current": current_month_tokens, "total": total_tokens, "id": keep_id},
+        )
+        conn.execute(
+            text("DELETE FROM billing WHERE user_id = :user_id AND id <> :id"),
+            {"user_id": user_id, "id": keep_id},
+        )
+        logger.info(f"Merged duplicate billing rows for user {user_id}.")
+
+
+def _convert_revenue_date(conn):
+    """Turn the legacy VARCHAR revenue.date column into a DATE column.
+
+    SQLite keeps ISO date strings, which the Date type reads as-is, so only
+    PostgreSQL needs the column rewritten.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    data_type = conn.execute(
+        text(
+            "SELECT data_type FROM information_schema.columns WHERE table_name = 'revenue' AND column_name = 'date'"
+        )
+    ).scalar()
+    if data_type and data_type != "date":
+        conn.execute(
+            text("ALTER TABLE revenue ALTER COLUMN date TYPE DATE USING date::date")
+        )
+        logger.info("Converted revenue.date to DATE.")
+
+
+def _add_missing_columns(conn):
+    """Add nullable model columns that existing tables do not have yet."""
+    inspector = inspect(conn)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                logger.error(
+                    f"Cannot add NOT NULL column {table.name}.{column.name} automatically."
+                )
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(
+                text(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                )
+            )
+            logger.info(f"Added column {table.name}.{column.name}.")
+
+
+def apply_migrations(engine):
+    """Bring an existing database up to the current models.
+
+    Safe to run repeatedly: creates missing tables and nullable columns, then any index declared
+    on the models that the database does not have yet.
+    """
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        _add_missing_columns(conn)
+        _merge_duplicate_billing(conn)
+        _convert_revenue_date(conn)
+        duplicate_emails = conn.execute(
+            text('SELECT email FROM "user" GROUP BY email HAVING COUNT(*) > 1')
+        ).all()
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                if table.name == "user" and duplicate_emails and index.unique:
+                    logger.error(
+                        f"Skipping unique index {index.name}: duplicate emails {[row[0] for row in duplicate_emails]} must be resolved first."
+                    )
+                    continue
+                index.create(conn, checkfirst=True)
+    with Session(engine) as session:
+        has_rollups = session.exec(select(RevenueMonthlyRollup.id).limit(1)).first()
+        has_revenue = session.exec(select(Revenue.id).limit(1)).first()
+        if has_revenue and not has_rollups:
+            rebuild_rollups(session)
+            session.commit()
+            logger.info("Backfilled monthly revenue rollups.")
+
+
+def migrate():
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        logger.error("DATABASE_URL environment variable is not set.")
+        sys.exit(1)
+    try:
+        apply_migrations(create_db_engine(database_url))
+        logger.info("Migrations applied successfully.")
+    except Exception as e:
+        logger.exception(f"Migration failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate()
\ No newline at end of file
@@ -0,0 +1,41 @@
+import argparse
+import logging
+import os
+import sys
+from sqlmodel import Session
+from app.db import create_db_engine
+from app.services.revenue import rebuild_rollups, check_rollups
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Backfill or verify the monthly revenue rollup table."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--check", action="store_true", help="only report inconsistent months"
+    )
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        logger.error("DATABASE_URL environment variable is not set.")
+        sys.exit(1)
+    engine = create_db_engine(database_url)
+    with Session(engine) as session:
+        if args.check:
+            mismatches = check_rollups(session, args.user_id)
+            for mismatch in mismatches:
+                logger.warning(f"Rollup mismatch: {mismatch}")
+            if mismatches:
+                sys.exit(1)
+            logger.info("Revenue rollups are consistent.")
+            return
+        rebuild_rollups(session, args.user_id)
+        session.commit()
+        logger.info("Revenue rollups rebuilt successfully.")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
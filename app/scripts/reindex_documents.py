@@ -0,0 +1,38 @@
+import logging
+import os
+import sys
+from sqlmodel import Session, select
+from app.db import create_db_engine
+from app.models import Document
+from app.services.search import ensure_search_index
+from app.services.chunking import replace_document_chunks
+from app.services.vector_index import ensure_vector_index, store_chunk_embeddings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def reindex_documents():
+    """Rebuild document chunks, the full-text index and chunk embeddings."""
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        logger.error("DATABASE_URL environment variable is not set.")
+        sys.exit(1)
+    engine = create_db_engine(database_url)
+    ensure_search_index(engine)
+    ensure_vector_index(engine)
+    with Session(engine) as session:
+        documents = session.exec(
+            select(Document).where(Document.extracted_text != None)
+        ).all()
+        for document in documents:
+            chunks = replace_document_chunks(
+                session, document.id, document.user_id, document.extracted_text
+            )
+            store_chunk_embeddings(session, chunks)
+        session.commit()
+        logger.info(f"Indexed {len(documents)} documents.")
+
+
+if __name__ == "__main__":
+    reindex_documents()
\ No newline at end of file
@@ -3,8 +3,10 @@ import os
 import sys
 import bcrypt
 from datetime import datetime, timedelta
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
+from app.db import create_db_engine
 from app.models import User, Revenue, Billing, Document
+from app.services.revenue import rebuild_rollups
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,7 +22,7 @@ def seed_data():
     if not database_url:
         logger.error("DATABASE_URL environment variable is not set.")
         sys.exit(1)
-    engine = create_engine(database_url)
+    engine = create_db_engine(database_url)
     with Session(engine) as session:
         logger.info("Checking for existing data...")
         admin_exists = session.exec(
@@ -69,25 +71,25 @@ def seed_data():
                 "amount": 2500.0,
                 "description": "Consulting Services - Project A",
                 "category": "Service",
-                "date": (datetime.now() - timedelta(days=5)).strftime("%Y-%m-%d"),
+                "date": (datetime.now() - timedelta(days=5)).date(),
             },
             {
                 "amount": 1800.0,
                 "description": "Web Development",
                 "category": "Service",
-                "date": (datetime.now() - timedelta(days=15)).strftime("%Y-%m-%d"),
+                "date": (datetime.now() - timedelta(days=15)).date(),
             },
             {
                 "amount": 450.0,
                 "description": "Product Sales",
                 "category": "Product Sale",
-                "date": (datetime.now() - timedelta(days=20)).strftime("%Y-%m-%d"),
+                "date": (datetime.now() - timedelta(days=20)).date(),
             },
             {
                 "amount": 3000.0,
                 "description": "Monthly Retainer",
                 "category": "Service",
-                "date": (datetime.now() - timedelta(days=35)).strftime("%Y-%m-%d"),
+                "date": (datetime.now() - timedelta(days=35)).date(),
             },
         ]
         for rev in revenues:
@@ -99,6 +101,7 @@ def seed_data():
                 date=rev["date"],
             )
             session.add(revenue_entry)
+        rebuild_rollups(session, test_user.id)
         session.commit()
         logger.info("Database seeded successfully!")
         logger.info("Admin: admin@example.com / admin123")
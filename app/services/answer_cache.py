@@ -0,0 +1,173 @@
+import os
+import re
+import time
+import hashlib
+import logging
+import unicodedata
+import numpy as np
+import redis.asyncio as aioredis
+from app.services.embeddings import embed_texts, to_bytes, from_bytes
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "86400"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "10000"))
+ANSWER_CACHE_SEMANTIC = os.getenv("ANSWER_CACHE_SEMANTIC", "0") == "1"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.92"))
+ANSWER_CACHE_SEMANTIC_CANDIDATES = int(
+    os.getenv("ANSWER_CACHE_SEMANTIC_CANDIDATES", "200")
+)
+_PREFIX = "answer_cache"
+_LRU_KEY = f"{_PREFIX}:lru"
+_HITS_KEY = f"{_PREFIX}:stats:hits"
+_MISSES_KEY = f"{_PREFIX}:stats:misses"
+
+_redis = None
+
+
+def _client():
+    global _redis
+    if _redis is None:
+        redis_url = f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', '6379')}/{os.getenv('ANSWER_CACHE_REDIS_DB', '1')}"
+        _redis = aioredis.from_url(
+            redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _redis
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace."""
+    text = unicodedata.normalize("NFKD", prompt.lower())
+    text = "".join((c for c in text if not unicodedata.combining(c)))
+    return " ".join(re.findall("\\w+", text))
+
+
+def context_fingerprint(parts: list[str]) -> str:
+    """Stable digest of the retrieved context that an answer was based on."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(hashlib.sha256(part.encode("utf-8")).digest())
+    return digest.hexdigest()
+
+
+def _entry_key(normalized: str, fingerprint: str) -> str:
+    digest = hashlib.sha256(f"{fingerprint}|{normalized}".encode("utf-8"))
+    return f"{_PREFIX}:entry:{fingerprint}:{digest.hexdigest()}"
+
+
+def _fingerprint_of(entry_key: bytes | str) -> str:
+    if isinstance(entry_key, bytes):
+        entry_key = entry_key.decode("utf-8")
+    return entry_key.split(":")[-2]
+
+
+def _semantic_key(fingerprint: str) -> str:
+    return f"{_PREFIX}:semantic:{fingerprint}"
+
+
+async def get_cached_answer(prompt: str, fingerprint: str) -> str | None:
+    """Look up a cached answer, by exact prompt first and then by similarity."""
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    normalized = normalize_prompt(prompt)
+    try:
+        client = _client()
+        key = _entry_key(normalized, fingerprint)
+        answer = await client.get(key)
+        if answer is None and ANSWER_CACHE_SEMANTIC:
+            key = await _find_similar(client, normalized, fingerprint)
+            if key:
+                answer = await client.get(key)
+                if answer is None:
+                    await client.hdel(_semantic_key(fingerprint), key)
+        if answer is None:
+            await client.incr(_MISSES_KEY)
+            return None
+        await client.zadd(_LRU_KEY, {key: time.time()})
+        await client.incr(_HITS_KEY)
+        return answer.decode("utf-8")
+    except Exception as e:
+        logging.warning(f"Answer cache lookup failed: {e}")
+        return None
+
+
+async def _find_similar(client, normalized: str, fingerprint: str) -> str | None:
+    candidates = await client.hgetall(_semantic_key(fingerprint))
+    if not candidates:
+        return None
+    keys = list(candidates.keys())[:ANSWER_CACHE_SEMANTIC_CANDIDATES]
+    matrix = np.vstack([from_bytes(candidates[key]) for key in keys])
+    query = embed_texts([normalized])[0]
+    if matrix.shape[1] != len(query):
+        return None
+    scores = matrix @ query
+    best = int(np.argmax(scores))
+    if scores[best] < ANSWER_CACHE_SIMILARITY:
+        return None
+    return keys[best].decode("utf-8")
+
+
+async def _trim_semantic(client, semantic_key: str):
+    """Keep a semantic hash to live entries, at most ANSWER_CACHE_SEMANTIC_CANDIDATES."""
+    fields = await client.hkeys(semantic_key)
+    if len(fields) <= ANSWER_CACHE_SEMANTIC_CANDIDATES:
+        return
+    scores = await client.zmscore(_LRU_KEY, fields)
+    ranked = sorted(zip(fields, scores), key=lambda item: item[1] or 0.0)
+    overflow = len(fields) - ANSWER_CACHE_SEMANTIC_CANDIDATES
+    stale = [
+        field
+        for i, (field, score) in enumerate(ranked)
+        if score is None or i < overflow
+    ]
+    await client.hdel(semantic_key, *stale)
+
+
+async def store_answer(prompt: str, fingerprint: str, answer: str):
+    """Cache an answer with a TTL, evicting least recently used entries.
+
+    Evicted entries are also removed from their fingerprint's semantic hash,
+    which is further trimmed to ANSWER_CACHE_SEMANTIC_CANDIDATES live entries.
+    """
+    if not ANSWER_CACHE_ENABLED:
+        return
+    normalized = normalize_prompt(prompt)
+    key = _entry_key(normalized, fingerprint)
+    try:
+        client = _client()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.set(key, answer, ex=ANSWER_CACHE_TTL)
+            pipe.zadd(_LRU_KEY, {key: time.time()})
+            if ANSWER_CACHE_SEMANTIC:
+                semantic_key = _semantic_key(fingerprint)
+                pipe.hset(semantic_key, key, to_bytes(embed_texts([normalized])[0]))
+                pipe.expire(semantic_key, ANSWER_CACHE_TTL)
+            await pipe.execute()
+        if ANSWER_CACHE_SEMANTIC:
+            await _trim_semantic(client, _semantic_key(fingerprint))
+        overflow = await client.zcard(_LRU_KEY) - ANSWER_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = [entry for entry, _ in await client.zpopmin(_LRU_KEY, overflow)]
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.delete(*evicted)
+                for entry in evicted:
+                    pipe.hdel(_semantic_key(_fingerprint_of(entry)), entry)
+                await pipe.execute()
+    except Exception as e:
+        logging.warning(f"Answer cache store failed: {e}")
+
+
+async def get_cache_stats() -> dict:
+    """Return hit/miss counters and the hit rate as a percentage."""
+    try:
+        client = _client()
+        hits = int(await client.get(_HITS_KEY) or 0)
+        misses = int(await client.get(_MISSES_KEY) or 0)
+    except Exception as e:
+        logging.warning(f"Answer cache stats unavailable: {e}")
+        hits = misses = 0
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total * 100 if total else 0.0,
+    }
\ No newline at end of file
@@ -0,0 +1,63 @@
+import os
+from sqlmodel import delete
+from app.models import DocumentChunk
+from app.services.search import index_chunks, remove_document
+
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1200"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+
+
+def chunk_text(
+    text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP
+) -> list[tuple[int, int, str]]:
+    """Split text into overlapping (start, end, content) windows.
+
+    Windows end on whitespace where possible so words are not cut in half.
+    """
+    text = text or ""
+    overlap = min(overlap, size // 2)
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            boundary = text.rfind(" ", start + size - overlap, end)
+            if boundary == -1:
+                boundary = text.rfind("\n", start + size - overlap, end)
+            if boundary > start:
+                end = boundary
+        content = text[start:end].strip()
+        if content:
+            chunks.append((start, end, content))
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def replace_document_chunks(session, document_id: int, user_id: int, text: str):
+    """Store fresh chunks for a document and add them to the search index."""
+    delete_document_chunks(session, document_id)
+    chunks = [
+        DocumentChunk(
+            document_id=document_id,
+            user_id=user_id,
+            chunk_index=i,
+            start_offset=start,
+            end_offset=end,
+            content=content,
+        )
+        for i, (start, end, content) in enumerate(chunk_text(text))
+    ]
+    session.add_all(chunks)
+    session.flush()
+    index_chunks(session, chunks)
+    return chunks
+
+
+def delete_document_chunks(session, document_id: int):
+    """Remove a document's chunks and their search entries."""
+    remove_document(session, document_id)
+    session.execute(
+        delete(DocumentChunk).where(DocumentChunk.document_id == document_id)
+    )
\ No newline at end of file
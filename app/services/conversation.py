@@ -0,0 +1,78 @@
+import os
+from sqlmodel import select
+from app.models import ChatMessage, ConversationSummary
+from app.services.retrieval import estimate_tokens
+
+CHAT_MEMORY_MESSAGES = int(os.getenv("CHAT_MEMORY_MESSAGES", "8"))
+CHAT_MEMORY_TOKEN_BUDGET = int(os.getenv("CHAT_MEMORY_TOKEN_BUDGET", "1500"))
+CHAT_SUMMARY_BATCH = int(os.getenv("CHAT_SUMMARY_BATCH", "6"))
+CHAT_SUMMARY_MAX_CHARS = int(os.getenv("CHAT_SUMMARY_MAX_CHARS", "2000"))
+
+
+def get_summary(session, user_id: int) -> ConversationSummary | None:
+    return session.exec(
+        select(ConversationSummary).where(ConversationSummary.user_id == user_id)
+    ).first()
+
+
+def build_conversation_context(
+    session, user_id: int, before_message_id: int
+) -> tuple[str, list[ChatMessage]]:
+    """Return the rolling summary and the recent turns that fit the memory budget.
+
+    The summary is always kept (it is capped at CHAT_SUMMARY_MAX_CHARS);
+    recent messages are added newest first until the budget runs out. The
+    last CHAT_MEMORY_MESSAGES are always candidates, and older messages too
+    until the summary has folded them in, so no turn falls between the two.
+    """
+    summary = get_summary(session, user_id)
+    summary_text = summary.summary if summary else ""
+    summarized_id = summary.last_message_id if summary else 0
+    budget = CHAT_MEMORY_TOKEN_BUDGET - (
+        estimate_tokens(summary_text) if summary_text else 0
+    )
+    recent = session.exec(
+        select(ChatMessage)
+        .where(ChatMessage.user_id == user_id)
+        .where(ChatMessage.id < before_message_id)
+        .order_by(ChatMessage.id.desc())
+        .limit(CHAT_MEMORY_MESSAGES + CHAT_SUMMARY_BATCH)
+    ).all()
+    history = []
+    for position, message in enumerate(recent):
+        if position >= CHAT_MEMORY_MESSAGES and message.id <= summarized_id:
+            break
+        cost = estimate_tokens(message.content)
+        if cost > budget:
+            break
+        history.append(message)
+        budget -= cost
+    return summary_text, list(reversed(history))
+
+
+def pending_summary_messages(session, user_id: int) -> list[ChatMessage]:
+    """Messages that left the recent-turn window but are not summarized yet."""
+    summary = get_summary(session, user_id)
+    window = session.exec(
+        select(ChatMessage.id)
+        .where(ChatMessage.user_id == user_id)
+        .order_by(ChatMessage.id.desc())
+        .offset(CHAT_MEMORY_MESSAGES)
+        .limit(1)
+    ).first()
+    if window is None:
+        return []
+    return session.exec(
+        select(ChatMessage)
+        .where(ChatMessage.user_id == user_id)
+        .where(ChatMessage.id > (summary.last_message_id if summary else 0))
+        .where(ChatMessage.id <= window)
+        .order_by(ChatMessage.id)
+    ).all()
+
+
+def summary_prompt(existing_summary: str, messages: list[ChatMessage]) -> str:
+    transcript = "\n".join(
+        (f"{message.role.upper()}: {message.content}" for message in messages)
+    )
+    return f"Update the running summary of a conversation between a Brazilian MEI and a fiscal assistant. Keep facts, figures, dates and open questions; drop pleasantries. Answer with the new summary only, in at most {CHAT_SUMMARY_MAX_CHARS // 5} words.\n\nCurrent summary:\n{existing_summary or '(empty)'}\n\nNew messages:\n{transcript}"
\ No newline at end of file
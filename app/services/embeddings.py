@@ -0,0 +1,86 @@
+import os
+import re
+import hashlib
+import logging
+import unicodedata
+import numpy as np
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")
+EMBEDDING_MODEL = os.getenv(
+    "EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+)
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))
+_TOKEN_RE = re.compile("\\w+", re.UNICODE)
+
+
+class HashingEmbedder:
+    """Offline embedder using signed feature hashing of words and word bigrams."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _tokens(self, text: str) -> list[str]:
+        normalized = unicodedata.normalize("NFKD", text.lower())
+        normalized = "".join((c for c in normalized if not unicodedata.combining(c)))
+        words = _TOKEN_RE.findall(normalized)
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in self._tokens(text or ""):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value >> 63 else -1.0
+                vectors[row, value % self.dim] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class LocalModelEmbedder:
+    """Embedder backed by a locally cached sentence-transformers model."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return self.model.encode(
+            texts, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+_embedder = None
+
+
+def get_embedder():
+    """Return the process-wide embedder selected by EMBEDDING_BACKEND."""
+    global _embedder
+    if _embedder is None:
+        if EMBEDDING_BACKEND == "local":
+            try:
+                _embedder = LocalModelEmbedder()
+            except Exception as e:
+                logging.exception(
+                    f"Local embedding model unavailable, falling back to hashing: {e}"
+                )
+                _embedder = HashingEmbedder()
+        else:
+            _embedder = HashingEmbedder()
+    return _embedder
+
+
+def embed_texts(texts: list[str]) -> np.ndarray:
+    """Embed texts into L2-normalised float32 row vectors."""
+    return get_embedder().embed(texts)
+
+
+def to_bytes(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
\ No newline at end of file
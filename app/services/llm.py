@@ -0,0 +1,112 @@
+import os
+import asyncio
+import threading
+import time
+import httpx
+from google import genai
+from google.genai import types
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+LLM_TIMEOUT_MS = int(os.getenv("LLM_TIMEOUT_MS", "60000"))
+LLM_RETRY_ATTEMPTS = int(os.getenv("LLM_RETRY_ATTEMPTS", "3"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+STUB_LLM_LATENCY_MS = int(os.getenv("STUB_LLM_LATENCY_MS", "50"))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class _StubUsage:
+    def __init__(self, total_token_count: int):
+        self.total_token_count = total_token_count
+
+
+class _StubResponse:
+    def __init__(self, text: str, usage_metadata: _StubUsage | None = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class _StubModels:
+    """Offline stand-in for ``client.models`` used for load testing."""
+
+    def _reply(self, contents) -> tuple[list[str], int]:
+        prompt = str(contents)
+        words = f"Stub answer for a prompt of {len(prompt.split())} words.".split()
+        return [f"{word} " for word in words], len(prompt.split()) + len(words)
+
+    def generate_content(self, model: str, contents, config=None):
+        pieces, tokens = self._reply(contents)
+        time.sleep(STUB_LLM_LATENCY_MS / 1000)
+        return _StubResponse("".join(pieces), _StubUsage(tokens))
+
+
+class _StubAsyncModels(_StubModels):
+    async def generate_content(self, model: str, contents, config=None):
+        pieces, tokens = self._reply(contents)
+        await asyncio.sleep(STUB_LLM_LATENCY_MS / 1000)
+        return _StubResponse("".join(pieces), _StubUsage(tokens))
+
+    async def generate_content_stream(self, model: str, contents, config=None):
+        pieces, tokens = self._reply(contents)
+
+        async def stream():
+            for i, piece in enumerate(pieces):
+                await asyncio.sleep(STUB_LLM_LATENCY_MS / 1000 / len(pieces))
+                usage = _StubUsage(tokens) if i == len(pieces) - 1 else None
+                yield _StubResponse(piece, usage)
+
+        return stream()
+
+
+class _StubAio:
+    def __init__(self):
+        self.models = _StubAsyncModels()
+
+
+class StubClient:
+    """Network-free client exposing the subset of genai.Client the app uses."""
+
+    def __init__(self):
+        self.models = _StubModels()
+        self.aio = _StubAio()
+
+
+def _build_client():
+    if LLM_BACKEND == "stub":
+        return StubClient()
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise Exception("Google API Key not configured")
+    limits = httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(LLM_TIMEOUT_MS / 1000)
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(
+            timeout=LLM_TIMEOUT_MS,
+            retry_options=types.HttpRetryOptions(attempts=LLM_RETRY_ATTEMPTS),
+            httpx_client=httpx.Client(limits=limits, timeout=timeout),
+            httpx_async_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+        ),
+    )
+
+
+def get_llm_client():
+    """Return the process-wide LLM client, creating it on first use.
+
+    The client keeps pooled keep-alive connections, so every chat session
+    in the process reuses the same TLS connections to the API.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
@@ -0,0 +1,184 @@
+import os
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import NamedTemporaryFile
+from typing import BinaryIO
+import pytesseract
+from pdf2image import convert_from_path
+import numpy as np
+from PIL import Image, ImageOps, ImageSequence
+from PyPDF2 import PdfReader
+
+OCR_PDF_DPI = int(os.getenv("OCR_PDF_DPI", "300"))
+OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "20"))
+OCR_PAGE_CONCURRENCY = int(os.getenv("OCR_PAGE_CONCURRENCY", str(os.cpu_count() or 2)))
+OCR_MAX_PROCESSES = int(os.getenv("OCR_MAX_PROCESSES", str(os.cpu_count() or 2)))
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1") == "1"
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_MAX_PIXELS = int(os.getenv("OCR_MAX_PIXELS", str(2480 * 3508)))
+OCR_PHOTO_MAX_PIXELS = int(os.getenv("OCR_PHOTO_MAX_PIXELS", str(1240 * 1754)))
+OCR_BINARIZE = os.getenv("OCR_BINARIZE", "1") == "1"
+OCR_DESKEW = os.getenv("OCR_DESKEW", "0") == "1"
+OCR_DESKEW_MAX_ANGLE = float(os.getenv("OCR_DESKEW_MAX_ANGLE", "5"))
+_PDF_SIGNATURE = b"%PDF-"
+_ocr_slots = threading.BoundedSemaphore(OCR_MAX_PROCESSES)
+
+
+def is_pdf(file: BinaryIO, content_type: str | None = None) -> bool:
+    """Detect PDFs by content type, falling back to the file signature."""
+    if content_type == "application/pdf":
+        return True
+    position = file.tell()
+    signature = file.read(len(_PDF_SIGNATURE))
+    file.seek(position)
+    return signature == _PDF_SIGNATURE
+
+
+def _scale_factor(size: tuple[int, int], dpi: float) -> float:
+    """Downscale factor bringing an image to OCR_TARGET_DPI and its pixel cap.
+
+    Images without DPI metadata (phone photos) are capped at
+    OCR_PHOTO_MAX_PIXELS instead of OCR_MAX_PIXELS, since their resolution
+    cannot be judged from the metadata and is usually far above what text
+    recognition needs.
+    """
+    scale = 1.0
+    if dpi > OCR_TARGET_DPI:
+        scale = OCR_TARGET_DPI / dpi
+    max_pixels = OCR_MAX_PIXELS if dpi else OCR_PHOTO_MAX_PIXELS
+    pixels = size[0] * size[1] * scale * scale
+    if pixels > max_pixels:
+        scale *= (max_pixels / pixels) ** 0.5
+    return scale
+
+
+def _otsu_threshold(image: Image.Image) -> int:
+    histogram = np.asarray(image.histogram()[:256], dtype=np.float64)
+    levels = np.arange(256)
+    weight = np.cumsum(histogram)
+    mean = np.cumsum(histogram * levels)
+    total, total_mean = weight[-1], mean[-1]
+    background = weight[:-1]
+    foreground = total - background
+    valid = (background > 0) & (foreground > 0)
+    variance = np.zeros(255)
+    variance[valid] = (
+        total_mean * background[valid] / total - mean[:-1][valid]
+    ) ** 2 / (background[valid] * foreground[valid])
+    return int(np.argmax(variance))
+
+
+def _skew_angle(image: Image.Image) -> float:
+    """Estimate text skew by maximizing the variance of row ink profiles."""
+    sample = image.copy()
+    sample.thumbnail((800, 800))
+    ink = ImageOps.invert(sample)
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-OCR_DESKEW_MAX_ANGLE, OCR_DESKEW_MAX_ANGLE + 0.01, 0.5):
+        rotated = np.asarray(ink.rotate(float(angle), fillcolor=0), dtype=np.float32)
+        score = float(np.var(rotated.sum(axis=1)))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def preprocess_image(image: Image.Image, dpi: float | None = None) -> Image.Image:
+    """Prepare an image for Tesseract: downscale, grayscale, binarize, deskew.
+
+    JPEGs are decoded directly at reduced size and in grayscale with
+    ``Image.draft`` so oversized phone photos are never fully decompressed.
+    """
+    if dpi is None:
+        dpi = float((image.info.get("dpi") or (0, 0))[0] or 0)
+    scale = _scale_factor(image.size, dpi)
+    if scale < 1 and image.format == "JPEG":
+        target = (int(image.width * scale), int(image.height * scale))
+        image.draft("L", target)
+        scale = min(target[0] / image.width, 1.0)
+    image = image.convert("L")
+    if scale < 1:
+        image = image.resize(
+            (max(int(image.width * scale), 1), max(int(image.height * scale), 1)),
+            Image.BILINEAR,
+            reducing_gap=2.0,
+        )
+    if OCR_DESKEW:
+        angle = _skew_angle(image)
+        if angle:
+            image = image.rotate(angle, expand=True, fillcolor=255)
+    if OCR_BINARIZE:
+        threshold = _otsu_threshold(image)
+        image = image.point(lambda value: 255 if value > threshold else 0)
+    return image
+
+
+def _recognize(image: Image.Image, preprocess: bool, dpi: float | None = None) -> str:
+    with _ocr_slots:
+        return pytesseract.image_to_string(
+            preprocess_image(image, dpi) if preprocess else image
+        )
+
+
+def ocr_image(image: Image.Image, preprocess: bool = OCR_PREPROCESS) -> str:
+    """OCR every frame of an image (multi-page TIFFs have several)."""
+    return "\n\n".join(
+        (_recognize(frame, preprocess) for frame in ImageSequence.Iterator(image))
+    )
+
+
+def _ocr_pdf_page(path: str, page_number: int) -> str:
+    with _ocr_slots:
+        images = convert_from_path(
+            path,
+            dpi=OCR_PDF_DPI,
+            first_page=page_number,
+            last_page=page_number,
+            grayscale=OCR_PREPROCESS,
+        )
+    return "\n\n".join(
+        (_recognize(image, OCR_PREPROCESS, OCR_PDF_DPI) for image in images)
+    )
+
+
+def extract_pdf_text(file: BinaryIO) -> str:
+    """Read a PDF's text layer, rasterizing and OCRing only scanned pages.
+
+    Pages whose embedded text has fewer than OCR_MIN_PAGE_CHARS characters
+    are treated as scanned; those are rendered with poppler and recognized
+    in parallel, each pdftoppm/tesseract call running as its own process.
+    Every such call, from any document or page thread, takes one of the
+    process-wide OCR_MAX_PROCESSES slots, so nested parallelism never runs
+    more than that many subprocesses at once.
+    """
+    reader = PdfReader(file)
+    texts = []
+    scanned = []
+    for page_number, page in enumerate(reader.pages, start=1):
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            logging.warning(f"Text layer unreadable on PDF page {page_number}: {e}")
+            text = ""
+        if len(text.strip()) < OCR_MIN_PAGE_CHARS:
+            scanned.append(page_number)
+        texts.append(text)
+    if scanned:
+        with NamedTemporaryFile(suffix=".pdf") as copy:
+            file.seek(0)
+            shutil.copyfileobj(file, copy)
+            copy.flush()
+            workers = min(OCR_PAGE_CONCURRENCY, len(scanned))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pages = pool.map(lambda n: _ocr_pdf_page(copy.name, n), scanned)
+                for page_number, text in zip(scanned, pages):
+                    texts[page_number - 1] = text
+    return "\n\n".join((text.strip() for text in texts if text.strip()))
+
+
+def extract_text(file: BinaryIO, content_type: str | None = None) -> str:
+    """Return the text of an uploaded document, running OCR only where needed."""
+    if is_pdf(file, content_type):
+        return extract_pdf_text(file)
+    return ocr_image(Image.open(file))
\ No newline at end of file
@@ -0,0 +1,62 @@
+import os
+from sqlmodel import select
+from app.models import DocumentChunk
+from app.services.search import search_chunks
+from app.services.vector_index import search_similar_chunks
+
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "2000"))
+RAG_CANDIDATE_CHUNKS = int(os.getenv("RAG_CANDIDATE_CHUNKS", "20"))
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+_RRF_K = 60
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budget decisions (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def rank_chunk_ids(session, user_id: int, query: str) -> list[int]:
+    """Rank candidate chunk ids by keyword search, vector search or both.
+
+    Hybrid mode merges the two rankings with reciprocal rank fusion.
+    """
+    keyword_ids = []
+    vector_ids = []
+    if RAG_RETRIEVAL_MODE in ("hybrid", "keyword"):
+        keyword_ids = search_chunks(session, user_id, query, limit=RAG_CANDIDATE_CHUNKS)
+    if RAG_RETRIEVAL_MODE in ("hybrid", "vector"):
+        vector_ids = search_similar_chunks(
+            session, user_id, query, limit=RAG_CANDIDATE_CHUNKS
+        )
+    scores = {}
+    for ranking in (keyword_ids, vector_ids):
+        for rank, chunk_id in enumerate(ranking):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (_RRF_K + rank)
+    return sorted(scores, key=scores.get, reverse=True)[:RAG_CANDIDATE_CHUNKS]
+
+
+def retrieve_context_chunks(
+    session, user_id: int, query: str, token_budget: int = RAG_CONTEXT_TOKEN_BUDGET
+) -> list[DocumentChunk]:
+    """Pick the best-ranked chunks for a query that fit within the token budget."""
+    chunk_ids = rank_chunk_ids(session, user_id, query)
+    if not chunk_ids:
+        return []
+    chunks_by_id = {
+        chunk.id: chunk
+        for chunk in session.exec(
+            select(DocumentChunk).where(DocumentChunk.id.in_(chunk_ids))
+        ).all()
+    }
+    selected = []
+    used_tokens = 0
+    for chunk_id in chunk_ids:
+        chunk = chunks_by_id.get(chunk_id)
+        if not chunk:
+            continue
+        cost = estimate_tokens(chunk.content)
+        if used_tokens + cost > token_budget:
+            continue
+        selected.append(chunk)
+        used_tokens += cost
+    return selected
\ No newline at end of file
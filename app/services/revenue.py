@@ -0,0 +1,161 @@
+import logging
+from collections import defaultdict
+from datetime import date
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select, delete, func
+from app.models import Revenue, RevenueMonthlyRollup
+
+
+def _upsert(session, rows: list[dict]):
+    """Add total/count deltas to rollup rows, creating missing months."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(RevenueMonthlyRollup)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(RevenueMonthlyRollup)
+    else:
+        for row in rows:
+            rollup = session.exec(
+                select(RevenueMonthlyRollup)
+                .where(RevenueMonthlyRollup.user_id == row["user_id"])
+                .where(RevenueMonthlyRollup.year == row["year"])
+                .where(RevenueMonthlyRollup.month == row["month"])
+                .with_for_update()
+            ).first() or RevenueMonthlyRollup(
+                user_id=row["user_id"], year=row["year"], month=row["month"]
+            )
+            rollup.total += row["total"]
+            rollup.count += row["count"]
+            session.add(rollup)
+        return
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "year", "month"],
+        set_={
+            "total": RevenueMonthlyRollup.total + statement.excluded.total,
+            "count": RevenueMonthlyRollup.count + statement.excluded.count,
+        },
+    )
+    session.execute(statement, rows)
+
+
+def apply_revenue_delta(
+    session, user_id: int, entry_date: date, amount: float, count: int = 1
+):
+    """Record a single added (count=1) or removed (count=-1) revenue entry."""
+    _upsert(
+        session,
+        [
+            {
+                "user_id": user_id,
+                "year": entry_date.year,
+                "month": entry_date.month,
+                "total": amount * count,
+                "count": count,
+            }
+        ],
+    )
+
+
+def apply_revenue_batch(session, entries: list[tuple[int, date, float]]):
+    """Record many added (user_id, date, amount) entries with one upsert per month."""
+    groups = defaultdict(lambda: [0.0, 0])
+    for user_id, entry_date, amount in entries:
+        group = groups[(user_id, entry_date.year, entry_date.month)]
+        group[0] += amount
+        group[1] += 1
+    if groups:
+        _upsert(
+            session,
+            [
+                {
+                    "user_id": user_id,
+                    "year": year,
+                    "month": month,
+                    "total": total,
+                    "count": count,
+                }
+                for (user_id, year, month), (total, count) in groups.items()
+            ],
+        )
+
+
+def get_monthly_totals(session, user_id: int, year: int) -> dict[int, float]:
+    """Read a year's monthly totals for a user from the rollup table."""
+    rows = session.exec(
+        select(RevenueMonthlyRollup.month, RevenueMonthlyRollup.total)
+        .where(RevenueMonthlyRollup.user_id == user_id)
+        .where(RevenueMonthlyRollup.year == year)
+    ).all()
+    return {month: total for month, total in rows}
+
+
+def _aggregate_revenue(user_id: int | None = None):
+    year = func.extract("year", Revenue.date)
+    month = func.extract("month", Revenue.date)
+    query = select(
+        Revenue.user_id,
+        year.label("year"),
+        month.label("month"),
+        func.sum(Revenue.amount).label("total"),
+        func.count(Revenue.id).label("count"),
+    ).group_by(Revenue.user_id, year, month)
+    if user_id is not None:
+        query = query.where(Revenue.user_id == user_id)
+    return query
+
+
+def rebuild_rollups(session, user_id: int | None = None):
+    """Recompute rollup rows from the raw Revenue table."""
+    statement = delete(RevenueMonthlyRollup)
+    if user_id is not None:
+        statement = statement.where(RevenueMonthlyRollup.user_id == user_id)
+    session.execute(statement)
+    rows = session.execute(_aggregate_revenue(user_id)).all()
+    if rows:
+        session.execute(
+            RevenueMonthlyRollup.__table__.insert(),
+            [
+                {
+                    "user_id": row.user_id,
+                    "year": int(row.year),
+                    "month": int(row.month),
+                    "total": float(row.total),
+                    "count": row.count,
+                }
+                for row in rows
+            ],
+        )
+
+
+def check_rollups(session, user_id: int | None = None) -> list[dict]:
+    """Compare rollups with the raw Revenue table and return mismatching months."""
+    expected = {
+        (row.user_id, int(row.year), int(row.month)): (float(row.total), row.count)
+        for row in session.execute(_aggregate_revenue(user_id)).all()
+    }
+    query = select(RevenueMonthlyRollup)
+    if user_id is not None:
+        query = query.where(RevenueMonthlyRollup.user_id == user_id)
+    actual = {
+        (rollup.user_id, rollup.year, rollup.month): (rollup.total, rollup.count)
+        for rollup in session.exec(query).all()
+        if rollup.count
+    }
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        want = expected.get(key, (0.0, 0))
+        have = actual.get(key, (0.0, 0))
+        if want[1] != have[1] or abs(want[0] - have[0]) > 0.005:
+            user, year, month = key
+            mismatches.append(
+                {
+                    "user_id": user,
+                    "year": year,
+                    "month": month,
+                    "expected": want,
+                    "actual": have,
+                }
+            )
+    if mismatches:
+        logging.warning(f"Found {len(mismatches)} inconsistent revenue rollups.")
+    return mismatches
\ No newline at end of file
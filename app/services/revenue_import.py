@@ -0,0 +1,220 @@
+import os
+import io
+import re
+import csv
+import hashlib
+import logging
+import unicodedata
+from itertools import chain
+from datetime import date, datetime
+from sqlmodel import select
+from app.models import Revenue
+from app.services.revenue import apply_revenue_batch
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_DEFAULT_CATEGORY = os.getenv("IMPORT_DEFAULT_CATEGORY", "Other")
+_CSV_COLUMNS = {
+    "date": ("date", "data", "dt", "data lancamento", "data movimento"),
+    "amount": ("amount", "valor", "value", "credito", "valor (r$)"),
+    "description": ("description", "descricao", "historico", "memo", "lancamento"),
+    "category": ("category", "categoria"),
+    "fitid": ("id", "fitid", "transaction id"),
+}
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y", "%Y%m%d")
+_OFX_TAG_RE = re.compile("<(/?)([A-Za-z0-9.]+)>([^<\\r\\n]*)")
+_GROUPED_AMOUNT_RE = re.compile("^[+-]?[1-9]\\d{0,2}([.,])\\d{3}(\\1\\d{3})*$")
+
+
+def _fold(value: str) -> str:
+    value = unicodedata.normalize("NFKD", value.strip().lower())
+    return "".join((c for c in value if not unicodedata.combining(c)))
+
+
+def parse_amount(value: str) -> float:
+    """Parse amounts such as ``1.234,56``, ``1,234.56``, ``R$ 1.500`` or ``-50``.
+
+    With a single kind of separator, groups of exactly three digits (``1.500``,
+    ``1.234.567``) are thousands; any other repeated separator is rejected.
+    """
+    value = value.strip().replace("R$", "").replace(" ", "")
+    if "," in value and "." in value:
+        thousands = "." if value.rfind(",") > value.rfind(".") else ","
+        value = value.replace(thousands, "")
+    elif _GROUPED_AMOUNT_RE.match(value):
+        value = value.replace(".", "").replace(",", "")
+    elif value.count(".") + value.count(",") > 1:
+        raise ValueError(f"Unrecognised amount {value!r}")
+    value = value.replace(",", ".")
+    return round(float(value), 2)
+
+
+def parse_date(value: str) -> date:
+    """Parse ISO, Brazilian (dd/mm/yyyy) and OFX (yyyymmdd...) dates."""
+    value = value.strip()
+    if re.match("^\\d{8}", value):
+        value = value[:8]
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date {value!r}")
+
+
+def iter_csv_rows(lines):
+    """Yield one dict per CSV data row, mapping known headers to field names.
+
+    The delimiter (comma, semicolon or tab) is sniffed from the header line
+    only, so the file is never read ahead.
+    """
+    header = next(iter(lines), "")
+    try:
+        dialect = csv.Sniffer().sniff(header, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(chain([header], lines), dialect)
+    columns = {}
+    for position, name in enumerate(next(reader, [])):
+        for field, aliases in _CSV_COLUMNS.items():
+            if _fold(name) in aliases and field not in columns:
+                columns[field] = position
+    if "date" not in columns or "amount" not in columns:
+        raise ValueError("CSV header must include date and amount columns")
+    for values in reader:
+        if not any((value.strip() for value in values)):
+            continue
+        yield {
+            field: values[position] if position < len(values) else ""
+            for field, position in columns.items()
+        }
+
+
+def iter_ofx_rows(lines):
+    """Yield one dict per ``<STMTTRN>`` block of an OFX (SGML or XML) statement."""
+    transaction = None
+    for line in lines:
+        for closing, tag, value in _OFX_TAG_RE.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and transaction is not None:
+                    yield {
+                        "date": transaction.get("DTPOSTED", ""),
+                        "amount": transaction.get("TRNAMT", ""),
+                        "description": transaction.get("MEMO")
+                        or transaction.get("NAME", ""),
+                        "fitid": transaction.get("FITID", ""),
+                    }
+                transaction = None if closing else {}
+            elif transaction is not None and not closing and value.strip():
+                transaction[tag] = value.strip()
+
+
+def _import_hash(user_id: int, entry: dict, occurrences: dict) -> str:
+    """Identify a row by FITID, or by its content and how often it already occurred.
+
+    Numbering identical rows keeps two genuine same-day credits apart while
+    re-importing the same statement still reproduces the same hashes.
+    Statements are ordered by date, so ``occurrences`` only counts the rows
+    of the current date and is reset when the date changes.
+    """
+    if entry["fitid"]:
+        key = f"{user_id}|fitid|{entry['fitid']}"
+    else:
+        if entry["date"] not in occurrences:
+            occurrences.clear()
+        counts = occurrences.setdefault(entry["date"], {})
+        key = f"{user_id}|{entry['date'].isoformat()}|{entry['amount']:.2f}|{_fold(entry['description'])}"
+        occurrence = counts.get(key, 0)
+        counts[key] = occurrence + 1
+        key = f"{key}|{occurrence}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _normalize_row(
+    user_id: int, raw: dict, now: datetime, occurrences: dict
+) -> dict | None:
+    """Validate a parsed row, returning None for debits and zero amounts."""
+    amount = parse_amount(raw.get("amount", ""))
+    if amount <= 0:
+        return None
+    entry = {
+        "user_id": user_id,
+        "amount": amount,
+        "description": (raw.get("description") or "").strip() or "Imported entry",
+        "category": (raw.get("category") or "").strip() or IMPORT_DEFAULT_CATEGORY,
+        "date": parse_date(raw.get("date", "")),
+        "fitid": (raw.get("fitid") or "").strip(),
+        "created_at": now,
+    }
+    entry["import_hash"] = _import_hash(user_id, entry, occurrences)
+    del entry["fitid"]
+    return entry
+
+
+def _insert_batch(session, user_id: int, batch: dict[str, dict]) -> int:
+    """Insert the batch rows that are not already stored and commit."""
+    existing = set(
+        session.exec(
+            select(Revenue.import_hash)
+            .where(Revenue.user_id == user_id)
+            .where(Revenue.import_hash.in_(list(batch)))
+        ).all()
+    )
+    rows = [row for key, row in batch.items() if key not in existing]
+    if rows:
+        session.execute(Revenue.__table__.insert(), rows)
+        apply_revenue_batch(
+            session, [(user_id, row["date"], row["amount"]) for row in rows]
+        )
+    session.commit()
+    return len(rows)
+
+
+def import_revenue_statement(session, user_id: int, stream, filename: str) -> dict:
+    """Stream a CSV or OFX bank statement into the user's revenue entries.
+
+    Rows are parsed one at a time and written in batches of
+    IMPORT_BATCH_SIZE with a single multi-row insert and rollup upsert per
+    batch, so only one batch of rows is held in memory at a time. Only
+    credits are imported; entries already imported (same FITID, or the same
+    n-th row with that date, amount and description) are skipped, which
+    makes re-importing a statement safe while keeping genuinely repeated
+    credits such as two identical Pix transfers on one day.
+    """
+    result = {"imported": 0, "duplicates": 0, "skipped": 0, "invalid": 0}
+    lines = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace")
+    is_ofx = filename.lower().endswith((".ofx", ".qfx"))
+    rows = iter_ofx_rows(lines) if is_ofx else iter_csv_rows(lines)
+    now = datetime.now()
+    batch = {}
+    occurrences = {}
+    try:
+        for line_number, raw in enumerate(rows, start=1):
+            try:
+                entry = _normalize_row(user_id, raw, now, occurrences)
+            except ValueError as e:
+                result["invalid"] += 1
+                logging.debug(f"Skipping invalid row {line_number} of {filename}: {e}")
+                continue
+            if entry is None:
+                result["skipped"] += 1
+            elif entry["import_hash"] in batch:
+                result["duplicates"] += 1
+            else:
+                batch[entry["import_hash"]] = entry
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    imported = _insert_batch(session, user_id, batch)
+                    result["imported"] += imported
+                    result["duplicates"] += len(batch) - imported
+                    batch = {}
+        if batch:
+            imported = _insert_batch(session, user_id, batch)
+            result["imported"] += imported
+            result["duplicates"] += len(batch) - imported
+    finally:
+        lines.detach()
+    if result["invalid"]:
+        logging.warning(
+            f"Skipped {result['invalid']} invalid rows while importing {filename}."
+        )
+    return result
\ No newline at end of file
@@ -0,0 +1,149 @@
+import os
+import re
+import logging
+from sqlalchemy import text
+
+SEARCH_LANGUAGE = os.getenv("SEARCH_LANGUAGE", "portuguese")
+_TOKEN_RE = re.compile("\\w+", re.UNICODE)
+
+
+def _dialect(bind) -> str:
+    return bind.dialect.name
+
+
+def _query_terms(query: str) -> list[str]:
+    """Split a free-text query into safe search terms."""
+    return list(dict.fromkeys(_TOKEN_RE.findall(query.lower())))
+
+
+def ensure_search_index(engine):
+    """Create the full-text index structures for the current database."""
+    dialect = _dialect(engine)
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            conn.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS chunk_search (chunk_id INTEGER PRIMARY KEY REFERENCES documentchunk(id) ON DELETE CASCADE, document_id INTEGER NOT NULL, user_id INTEGER NOT NULL, tsv TSVECTOR NOT NULL)"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_chunk_search_tsv ON chunk_search USING GIN (tsv)"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_chunk_search_user_id ON chunk_search (user_id)"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_chunk_search_document_id ON chunk_search (document_id)"
+                )
+            )
+        elif dialect == "sqlite":
+            conn.execute(
+                text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS chunk_fts USING fts5(content, chunk_id UNINDEXED, document_id UNINDEXED, user_id UNINDEXED, tokenize='unicode61 remove_diacritics 2')"
+                )
+            )
+        else:
+            logging.warning(
+                f"Full-text search is not supported on {dialect}; chat retrieval will use LIKE matching."
+            )
+
+
+def index_chunks(session, chunks: list):
+    """Insert search entries for freshly stored document chunks."""
+    if not chunks:
+        return
+    dialect = _dialect(session.get_bind())
+    params = [
+        {
+            "chunk_id": chunk.id,
+            "document_id": chunk.document_id,
+            "user_id": chunk.user_id,
+            "content": chunk.content,
+            "language": SEARCH_LANGUAGE,
+        }
+        for chunk in chunks
+    ]
+    if dialect == "postgresql":
+        session.execute(
+            text(
+                "INSERT INTO chunk_search (chunk_id, document_id, user_id, tsv) VALUES (:chunk_id, :document_id, :user_id, to_tsvector(CAST(:language AS regconfig), :content)) ON CONFLICT (chunk_id) DO UPDATE SET tsv = EXCLUDED.tsv"
+            ),
+            params,
+        )
+    elif dialect == "sqlite":
+        session.execute(
+            text(
+                "INSERT INTO chunk_fts (content, chunk_id, document_id, user_id) VALUES (:content, :chunk_id, :document_id, :user_id)"
+            ),
+            params,
+        )
+
+
+def remove_document(session, document_id: int):
+    """Drop all of a document's chunks from the search index."""
+    dialect = _dialect(session.get_bind())
+    if dialect == "postgresql":
+        session.execute(
+            text("DELETE FROM chunk_search WHERE document_id = :document_id"),
+            {"document_id": document_id},
+        )
+    elif dialect == "sqlite":
+        session.execute(
+            text("DELETE FROM chunk_fts WHERE document_id = :document_id"),
+            {"document_id": document_id},
+        )
+
+
+def search_chunks(session, user_id: int, query: str, limit: int = 20) -> list[int]:
+    """Return ids of the user's best matching document chunks, best first.
+
+    Terms are OR-ed together and ranked with BM25 on SQLite (FTS5) and with
+    length-normalised cover density on PostgreSQL (tsvector/GIN).
+    """
+    terms = _query_terms(query)
+    if not terms:
+        return []
+    dialect = _dialect(session.get_bind())
+    if dialect == "postgresql":
+        rows = session.execute(
+            text(
+                "SELECT chunk_id FROM chunk_search, to_tsquery(CAST(:language AS regconfig), :terms) AS q WHERE user_id = :user_id AND tsv @@ q ORDER BY ts_rank_cd(tsv, q, 1 | 32) DESC LIMIT :limit"
+            ),
+            {
+                "language": SEARCH_LANGUAGE,
+                "terms": " | ".join(terms),
+                "user_id": user_id,
+                "limit": limit,
+            },
+        )
+    elif dialect == "sqlite":
+        rows = session.execute(
+            text(
+                "SELECT chunk_id FROM chunk_fts WHERE chunk_fts MATCH :terms AND user_id = :user_id ORDER BY bm25(chunk_fts) LIMIT :limit"
+            ),
+            {
+                "terms": " OR ".join((f'"{term}"' for term in terms)),
+                "user_id": user_id,
+                "limit": limit,
+            },
+        )
+    else:
+        conditions = " OR ".join(
+            (f"LOWER(content) LIKE :term{i}" for i in range(len(terms)))
+        )
+        rows = session.execute(
+            text(
+                f"SELECT id FROM documentchunk WHERE user_id = :user_id AND ({conditions}) LIMIT :limit"
+            ),
+            {
+                "user_id": user_id,
+                "limit": limit,
+                **{f"term{i}": f"%{term}%" for i, term in enumerate(terms)},
+            },
+        )
+    return [row[0] for row in rows]
\ No newline at end of file
@@ -1,9 +1,57 @@
 import os
+import time
+import hashlib
+import threading
+import urllib3
+from collections import OrderedDict
 from minio import Minio
 from minio.error import S3Error
 import io
 import logging
 from datetime import timedelta
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Iterator
+
+STORAGE_POOL_SIZE = int(os.getenv("STORAGE_POOL_SIZE", "20"))
+STORAGE_CONNECT_TIMEOUT = float(os.getenv("STORAGE_CONNECT_TIMEOUT", "5"))
+STORAGE_READ_TIMEOUT = float(os.getenv("STORAGE_READ_TIMEOUT", "60"))
+STORAGE_REPROBE_SECONDS = float(os.getenv("STORAGE_REPROBE_SECONDS", "30"))
+STORAGE_PART_SIZE = int(os.getenv("STORAGE_PART_SIZE", str(8 * 1024 * 1024)))
+STORAGE_URL_TTL_SECONDS = int(os.getenv("STORAGE_URL_TTL_SECONDS", "3600"))
+STORAGE_URL_SAFETY_MARGIN = int(os.getenv("STORAGE_URL_SAFETY_MARGIN", "300"))
+STORAGE_URL_CACHE_SIZE = int(os.getenv("STORAGE_URL_CACHE_SIZE", "1024"))
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", str(64 * 1024)))
+STORAGE_SPOOL_THRESHOLD = int(
+    os.getenv("STORAGE_SPOOL_THRESHOLD", str(16 * 1024 * 1024))
+)
+
+_storage = None
+_storage_pid = None
+_storage_lock = threading.Lock()
+
+
+class _HashingReader:
+    """File-like wrapper that counts and hashes bytes as they are read."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.size += len(data)
+        self.sha256.update(data)
+        return data
+
+
+def hash_stream(stream: BinaryIO) -> tuple[int, str]:
+    """Return the (size, sha256) of a seekable stream, read in chunks, and rewind it."""
+    reader = _HashingReader(stream)
+    while reader.read(STORAGE_CHUNK_SIZE):
+        pass
+    stream.seek(0)
+    return reader.size, reader.sha256.hexdigest()
 
 
 class StorageService:
@@ -14,78 +62,211 @@ class StorageService:
         self.internal_endpoint = os.getenv("MINIO_ENDPOINT", default_endpoint)
         self.public_endpoint = os.getenv("MINIO_PUBLIC_ENDPOINT", "localhost:9000")
         self.bucket_name = "fiscal-documents"
-        self.client = None
+        self._available = None
+        self._probe_lock = threading.Lock()
+        self._reprobe_thread = None
+        self._url_cache: OrderedDict = OrderedDict()
+        self._url_lock = threading.Lock()
+        self.client = self._make_client(
+            STORAGE_POOL_SIZE,
+            urllib3.Retry(
+                total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+            ),
+        )
+        self._probe_client = self._make_client(1, False)
+
+    def _make_client(self, pool_size: int, retries) -> Minio:
+        return Minio(
+            self.internal_endpoint,
+            access_key=os.getenv("MINIO_ACCESS_KEY", "minioadmin"),
+            secret_key=os.getenv("MINIO_SECRET_KEY", "minioadmin"),
+            secure=False,
+            http_client=urllib3.PoolManager(
+                maxsize=pool_size,
+                timeout=urllib3.Timeout(
+                    connect=STORAGE_CONNECT_TIMEOUT, read=STORAGE_READ_TIMEOUT
+                ),
+                retries=retries,
+            ),
+        )
+
+    def _probe(self, log_failure: bool = True) -> bool:
+        """Check the connection and make sure the bucket exists.
+
+        The probe uses its own client without retries, so an unreachable
+        endpoint fails after one connect timeout instead of several.
+        """
         try:
-            client = Minio(
-                self.internal_endpoint,
-                access_key=os.getenv("MINIO_ACCESS_KEY", "minioadmin"),
-                secret_key=os.getenv("MINIO_SECRET_KEY", "minioadmin"),
-                secure=False,
-            )
-            if not client.bucket_exists(self.bucket_name):
-                client.make_bucket(self.bucket_name)
-            self.client = client
+            if not self._probe_client.bucket_exists(self.bucket_name):
+                self._probe_client.make_bucket(self.bucket_name)
             logging.info(
                 f"Storage Service initialized successfully at {self.internal_endpoint}"
             )
+            return True
         except Exception as e:
-            logging.exception(
-                f"Storage Service unavailable (Endpoint: {self.internal_endpoint}). Document features will be limited. Error: {e}"
-            )
-            logging.info(
-                "To enable storage, ensure MinIO is running and accessible via MINIO_ENDPOINT."
-            )
-            self.client = None
+            if log_failure:
+                logging.exception(
+                    f"Storage Service unavailable (Endpoint: {self.internal_endpoint}). Document features will be limited. Error: {e}"
+                )
+                logging.info(
+                    "To enable storage, ensure MinIO is running and accessible via MINIO_ENDPOINT."
+                )
+            return False
+
+    def _reprobe(self):
+        while not self._available:
+            time.sleep(STORAGE_REPROBE_SECONDS)
+            self._available = self._probe(log_failure=False)
+
+    def _mark_unavailable(self):
+        """Flag storage as down and re-probe it in a background thread."""
+        with self._probe_lock:
+            self._available = False
+            if self._reprobe_thread is None or not self._reprobe_thread.is_alive():
+                self._reprobe_thread = threading.Thread(
+                    target=self._reprobe, name="storage-reprobe", daemon=True
+                )
+                self._reprobe_thread.start()
+
+    def _handle_error(self, e: Exception):
+        if isinstance(e, urllib3.exceptions.HTTPError):
+            self._mark_unavailable()
 
     @property
     def is_available(self) -> bool:
-        """Check if storage service is initialized and available."""
-        return self.client is not None
+        """Check if storage is reachable, verifying the bucket on first use."""
+        if self._available is None:
+            with self._probe_lock:
+                if self._available is None:
+                    self._available = self._probe()
+            if not self._available:
+                self._mark_unavailable()
+        return self._available
 
     def upload_file(self, file_data: bytes, filename: str, content_type: str) -> str:
         """Upload a file to MinIO and return the object path."""
+        self.upload_stream(io.BytesIO(file_data), filename, content_type)
+        return filename
+
+    def upload_stream(
+        self, stream: BinaryIO, filename: str, content_type: str
+    ) -> tuple[int, str]:
+        """Stream a file-like object to MinIO and return its (size, sha256).
+
+        The object is sent as a multipart upload of STORAGE_PART_SIZE parts,
+        so memory use is bounded by one part whatever the file size.
+        """
         if not self.is_available:
             raise Exception("Storage service is not available. Cannot upload file.")
+        reader = _HashingReader(stream)
         try:
-            file_stream = io.BytesIO(file_data)
             self.client.put_object(
                 self.bucket_name,
                 filename,
-                file_stream,
-                length=len(file_data),
+                reader,
+                length=-1,
+                part_size=STORAGE_PART_SIZE,
                 content_type=content_type,
             )
-            return filename
+            return reader.size, reader.sha256.hexdigest()
         except Exception as e:
             logging.exception(f"Storage Upload Error: {e}")
+            self._handle_error(e)
             raise e
 
     def get_file_url(self, filename: str) -> str:
-        """Get a presigned URL for the file."""
+        """Get a presigned URL for the file, reusing one that is still fresh.
+
+        URLs are cached until STORAGE_URL_SAFETY_MARGIN seconds before they
+        expire, so a cached URL is always valid for at least that long.
+        """
         if not self.is_available:
             logging.warning("Storage service unavailable, cannot generate URL")
             return ""
+        now = time.monotonic()
+        with self._url_lock:
+            cached = self._url_cache.get(filename)
+            if cached and cached[1] > now:
+                self._url_cache.move_to_end(filename)
+                return cached[0]
         try:
             url = self.client.get_presigned_url(
-                "GET", self.bucket_name, filename, expires=timedelta(hours=1)
+                "GET",
+                self.bucket_name,
+                filename,
+                expires=timedelta(seconds=STORAGE_URL_TTL_SECONDS),
             )
             if self.internal_endpoint != self.public_endpoint:
-                return url.replace(self.internal_endpoint, self.public_endpoint)
-            return url
+                url = url.replace(self.internal_endpoint, self.public_endpoint)
         except Exception as e:
             logging.exception(f"Storage URL Generation Error: {e}")
+            self._handle_error(e)
             return ""
+        with self._url_lock:
+            self._url_cache[filename] = (
+                url,
+                now + STORAGE_URL_TTL_SECONDS - STORAGE_URL_SAFETY_MARGIN,
+            )
+            self._url_cache.move_to_end(filename)
+            while len(self._url_cache) > STORAGE_URL_CACHE_SIZE:
+                self._url_cache.popitem(last=False)
+        return url
 
-    def get_file_content(self, filename: str) -> bytes:
-        """Download file content from MinIO."""
+    def get_file_urls(self, filenames: list[str]) -> dict[str, str]:
+        """Get presigned URLs for many files at once, keyed by object path."""
+        if not self.is_available:
+            return {}
+        return {filename: self.get_file_url(filename) for filename in filenames}
+
+    def iter_file_chunks(
+        self, filename: str, offset: int = 0, length: int = 0
+    ) -> Iterator[bytes]:
+        """Stream an object (or a byte range of it) from MinIO in chunks.
+
+        The pooled connection is released when the iterator is exhausted or
+        closed, including when the caller stops early.
+        """
         if not self.is_available:
             raise Exception("Storage service unavailable. Cannot download file.")
         try:
-            response = self.client.get_object(self.bucket_name, filename)
-            return response.read()
+            response = self.client.get_object(
+                self.bucket_name, filename, offset=offset, length=length
+            )
         except Exception as e:
             logging.exception(f"Storage Download Error: {e}")
+            self._handle_error(e)
             raise e
+        try:
+            yield from response.stream(STORAGE_CHUNK_SIZE)
+        except Exception as e:
+            logging.exception(f"Storage Download Error: {e}")
+            self._handle_error(e)
+            raise e
+        finally:
+            response.close()
+            response.release_conn()
+
+    def open_file(
+        self, filename: str, offset: int = 0, length: int = 0
+    ) -> SpooledTemporaryFile:
+        """Download an object into a file that spills to disk past a threshold.
+
+        Objects up to STORAGE_SPOOL_THRESHOLD bytes stay in memory. The
+        caller owns the returned file and should close it, e.g. with ``with``.
+        """
+        spool = SpooledTemporaryFile(max_size=STORAGE_SPOOL_THRESHOLD)
+        try:
+            for chunk in self.iter_file_chunks(filename, offset, length):
+                spool.write(chunk)
+        except Exception:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
+    def get_file_content(self, filename: str) -> bytes:
+        """Download file content from MinIO."""
+        return b"".join(self.iter_file_chunks(filename))
 
     def delete_file(self, filename: str):
         """Delete a file from MinIO."""
@@ -93,5 +274,23 @@ class StorageService:
             return
         try:
             self.client.remove_object(self.bucket_name, filename)
+            with self._url_lock:
+                self._url_cache.pop(filename, None)
         except Exception as e:
-            logging.exception(f"Storage Delete Error: {e}")
\ No newline at end of file
+            logging.exception(f"Storage Delete Error: {e}")
+            self._handle_error(e)
+
+
+def get_storage() -> StorageService:
+    """Return this process's storage service, creating it on first use.
+
+    The MinIO client and its connection pool are rebuilt after a fork so
+    Celery worker children never share sockets with their parent.
+    """
+    global _storage, _storage_pid
+    if _storage is None or _storage_pid != os.getpid():
+        with _storage_lock:
+            if _storage is None or _storage_pid != os.getpid():
+                _storage = StorageService()
+                _storage_pid = os.getpid()
+    return _storage
\ No newline at end of file
@@ -0,0 +1,228 @@
+import os
+import logging
+from collections import OrderedDict
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import select, func
+from app.models import DocumentChunk
+from app.services.embeddings import embed_texts, get_embedder, to_bytes, from_bytes
+
+PGVECTOR_INDEX_TYPE = os.getenv("PGVECTOR_INDEX_TYPE", "hnsw")
+VECTOR_IVF_LISTS = int(os.getenv("VECTOR_IVF_LISTS", "0"))
+VECTOR_IVF_PROBES = int(os.getenv("VECTOR_IVF_PROBES", "4"))
+VECTOR_CACHE_USERS = int(os.getenv("VECTOR_CACHE_USERS", "64"))
+VECTOR_MIN_SIMILARITY = float(os.getenv("VECTOR_MIN_SIMILARITY", "0.1"))
+
+_pgvector_enabled = None
+_pgvector_iterative_scan = None
+_user_indexes: OrderedDict = OrderedDict()
+
+
+def ensure_vector_index(engine):
+    """Create the pgvector table and ANN index when the database supports it."""
+    if engine.dialect.name != "postgresql":
+        return
+    dim = get_embedder().dim
+    if PGVECTOR_INDEX_TYPE == "ivfflat":
+        index_sql = "CREATE INDEX IF NOT EXISTS ix_chunk_embedding_vector ON chunk_embedding USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)"
+    else:
+        index_sql = "CREATE INDEX IF NOT EXISTS ix_chunk_embedding_vector ON chunk_embedding USING hnsw (embedding vector_cosine_ops)"
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS chunk_embedding (chunk_id INTEGER PRIMARY KEY REFERENCES documentchunk(id) ON DELETE CASCADE, user_id INTEGER NOT NULL, embedding vector({dim}) NOT NULL)"
+                )
+            )
+            conn.execute(text(index_sql))
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_chunk_embedding_user_id ON chunk_embedding (user_id)"
+                )
+            )
+    except Exception as e:
+        logging.warning(
+            f"pgvector unavailable, vector search will use the in-process index: {e}"
+        )
+
+
+def _use_pgvector(session) -> bool:
+    global _pgvector_enabled
+    if _pgvector_enabled is None:
+        _pgvector_enabled = False
+        if session.get_bind().dialect.name == "postgresql":
+            _pgvector_enabled = (
+                session.execute(
+                    text("SELECT to_regclass('chunk_embedding') IS NOT NULL")
+                ).scalar()
+                is True
+            )
+    return _pgvector_enabled
+
+
+def _supports_iterative_scan(session) -> bool:
+    """Whether the installed pgvector (0.8+) can keep scanning past filtered rows."""
+    global _pgvector_iterative_scan
+    if _pgvector_iterative_scan is None:
+        version = session.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        ).scalar()
+        parts = tuple((int(part) for part in (version or "0").split(".")[:2]))
+        _pgvector_iterative_scan = parts >= (0, 8)
+    return _pgvector_iterative_scan
+
+
+def _vector_literal(vector: np.ndarray) -> str:
+    return "[" + ",".join((f"{value:.6f}" for value in vector)) + "]"
+
+
+def store_chunk_embeddings(session, chunks: list[DocumentChunk]):
+    """Compute and persist embeddings for the given chunks.
+
+    With pgvector they live only in ``chunk_embedding``; otherwise they are
+    stored as bytes on the chunk for the in-process index.
+    """
+    if not chunks:
+        return
+    vectors = embed_texts([chunk.content for chunk in chunks])
+    if not _use_pgvector(session):
+        for chunk, vector in zip(chunks, vectors):
+            chunk.embedding = to_bytes(vector)
+            session.add(chunk)
+    else:
+        session.execute(
+            text(
+                "INSERT INTO chunk_embedding (chunk_id, user_id, embedding) VALUES (:chunk_id, :user_id, CAST(:embedding AS vector)) ON CONFLICT (chunk_id) DO UPDATE SET embedding = EXCLUDED.embedding"
+            ),
+            [
+                {
+                    "chunk_id": chunk.id,
+                    "user_id": chunk.user_id,
+                    "embedding": _vector_literal(vector),
+                }
+                for chunk, vector in zip(chunks, vectors)
+            ],
+        )
+
+
+class InProcessVectorIndex:
+    """Cosine-similarity index over one user's chunk embeddings.
+
+    Searches by brute-force matrix product, or by probing the nearest
+    k-means cells first when built with ``n_lists`` (IVF).
+    """
+
+    def __init__(self, ids: list[int], matrix: np.ndarray, n_lists: int = 0):
+        self.ids = np.asarray(ids)
+        self.matrix = matrix
+        self.centroids = None
+        self.assignments = None
+        if n_lists and len(ids) >= n_lists * 8:
+            self._train(n_lists)
+
+    def _train(self, n_lists: int, iterations: int = 10):
+        rng = np.random.default_rng(0)
+        centroids = self.matrix[rng.choice(len(self.matrix), n_lists, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(self.matrix @ centroids.T, axis=1)
+            for cell in range(n_lists):
+                members = self.matrix[assignments == cell]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[cell] = centroid / (np.linalg.norm(centroid) or 1.0)
+        self.centroids = centroids
+        self.assignments = np.argmax(self.matrix @ centroids.T, axis=1)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        n_probe: int = VECTOR_IVF_PROBES,
+        min_similarity: float = VECTOR_MIN_SIMILARITY,
+    ) -> list[int]:
+        candidates = np.arange(len(self.ids))
+        if self.centroids is not None:
+            cells = np.argsort(-(self.centroids @ query))[:n_probe]
+            candidates = np.flatnonzero(np.isin(self.assignments, cells))
+        if not len(candidates):
+            return []
+        scores = self.matrix[candidates] @ query
+        top = np.argsort(-scores)[:k]
+        return [
+            int(self.ids[candidates[i]]) for i in top if scores[i] >= min_similarity
+        ]
+
+
+def _user_index(session, user_id: int) -> InProcessVectorIndex | None:
+    version = session.exec(
+        select(func.count(DocumentChunk.id), func.max(DocumentChunk.id))
+        .where(DocumentChunk.user_id == user_id)
+        .where(DocumentChunk.embedding != None)
+    ).one()
+    cached = _user_indexes.get(user_id)
+    if cached and cached[0] == tuple(version):
+        _user_indexes.move_to_end(user_id)
+        return cached[1]
+    if not version[0]:
+        _user_indexes.pop(user_id, None)
+        return None
+    rows = session.exec(
+        select(DocumentChunk.id, DocumentChunk.embedding)
+        .where(DocumentChunk.user_id == user_id)
+        .where(DocumentChunk.embedding != None)
+    ).all()
+    dim = get_embedder().dim
+    rows = [(chunk_id, from_bytes(data)) for chunk_id, data in rows]
+    rows = [(chunk_id, vector) for chunk_id, vector in rows if len(vector) == dim]
+    if not rows:
+        return None
+    index = InProcessVectorIndex(
+        [chunk_id for chunk_id, _ in rows],
+        np.vstack([vector for _, vector in rows]),
+        n_lists=VECTOR_IVF_LISTS,
+    )
+    _user_indexes[user_id] = (tuple(version), index)
+    _user_indexes.move_to_end(user_id)
+    while len(_user_indexes) > VECTOR_CACHE_USERS:
+        _user_indexes.popitem(last=False)
+    return index
+
+
+def search_similar_chunks(
+    session, user_id: int, query: str, limit: int = 20
+) -> list[int]:
+    """Return ids of the user's chunks closest to the query embedding.
+
+    The ANN index spans every tenant, so a plain ``WHERE user_id`` would only
+    filter the index's first few candidates. On pgvector 0.8+ the index scan
+    is made iterative, continuing until enough of the user's rows are found;
+    older versions fall back to an exact scan over the user's rows via the
+    ``user_id`` index (``distance + 0`` keeps the planner off the ANN index).
+    """
+    if not query.strip():
+        return []
+    query_vector = embed_texts([query])[0]
+    if _use_pgvector(session):
+        if _supports_iterative_scan(session):
+            scan = "ivfflat" if PGVECTOR_INDEX_TYPE == "ivfflat" else "hnsw"
+            session.execute(text(f"SET LOCAL {scan}.iterative_scan = relaxed_order"))
+            order = "distance"
+        else:
+            order = "distance + 0"
+        rows = session.execute(
+            text(
+                f"SELECT chunk_id FROM (SELECT chunk_id, embedding <=> CAST(:embedding AS vector) AS distance FROM chunk_embedding WHERE user_id = :user_id ORDER BY {order} LIMIT :limit) AS nearest WHERE distance <= :max_distance ORDER BY distance"
+            ),
+            {
+                "user_id": user_id,
+                "embedding": _vector_literal(query_vector),
+                "limit": limit,
+                "max_distance": 1.0 - VECTOR_MIN_SIMILARITY,
+            },
+        )
+        return [row[0] for row in rows]
+    index = _user_index(session, user_id)
+    if index is None:
+        return []
+    return index.search(query_vector, limit)
\ No newline at end of file
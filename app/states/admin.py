@@ -2,6 +2,7 @@ import reflex as rx
 from sqlmodel import select, func
 from app.models import User, Billing, Revenue, Document
 from app.states.auth import AuthState
+from app.services.answer_cache import get_cache_stats
 
 
 class AdminState(rx.State):
@@ -9,6 +10,9 @@ class AdminState(rx.State):
     total_users: int = 0
     total_tokens: int = 0
     total_revenue_tracked: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_hit_rate: float = 0.0
 
     @rx.event
     async def load_admin_data(self):
@@ -25,6 +29,10 @@ class AdminState(rx.State):
             self.total_tokens = billing_total
             revenue_total = session.exec(select(func.sum(Revenue.amount))).one() or 0
             self.total_revenue_tracked = revenue_total
+        cache_stats = await get_cache_stats()
+        self.cache_hits = cache_stats["hits"]
+        self.cache_misses = cache_stats["misses"]
+        self.cache_hit_rate = cache_stats["hit_rate"]
 
     @rx.event
     async def toggle_admin(self, user_id: int):
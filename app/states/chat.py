@@ -1,41 +1,118 @@
 import reflex as rx
-from sqlmodel import select
-import os
-from google import genai
+from sqlmodel import select, or_, and_
 from google.genai import types
 import logging
 from datetime import datetime
-from app.models import ChatMessage, Document, Billing
+from app.models import ChatMessage, Billing
 from app.states.auth import AuthState
+from app.services.retrieval import retrieve_context_chunks
+from app.services.llm import get_llm_client, LLM_MODEL
+from app.services.conversation import build_conversation_context
+from app.tasks import summarize_conversation
+from app.services.answer_cache import (
+    context_fingerprint,
+    get_cached_answer,
+    store_answer,
+)
+
+CHAT_PAGE_SIZE = 30
+CHAT_WINDOW_SIZE = 120
+
+
+def _history_page(session, user_id: int, before=None, after=None) -> list[ChatMessage]:
+    """Fetch one keyset page of messages, oldest first.
+
+    Returns up to CHAT_PAGE_SIZE + 1 rows so callers can tell whether
+    another page exists beyond this one.
+    """
+    query = select(ChatMessage).where(ChatMessage.user_id == user_id)
+    if after is not None:
+        query = query.where(
+            or_(
+                ChatMessage.created_at > after.created_at,
+                and_(
+                    ChatMessage.created_at == after.created_at,
+                    ChatMessage.id > after.id,
+                ),
+            )
+        ).order_by(ChatMessage.created_at, ChatMessage.id)
+        return session.exec(query.limit(CHAT_PAGE_SIZE + 1)).all()
+    if before is not None:
+        query = query.where(
+            or_(
+                ChatMessage.created_at < before.created_at,
+                and_(
+                    ChatMessage.created_at == before.created_at,
+                    ChatMessage.id < before.id,
+                ),
+            )
+        )
+    query = query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+    return list(reversed(session.exec(query.limit(CHAT_PAGE_SIZE + 1)).all()))
 
 
 class ChatState(rx.State):
     messages: list[ChatMessage] = []
+    has_older_messages: bool = False
+    has_newer_messages: bool = False
     is_loading: bool = False
+    is_streaming: bool = False
     current_month_tokens: int = 0
 
+    def _load_latest_page(self, session, user_id: int):
+        page = _history_page(session, user_id)
+        self.has_older_messages = len(page) > CHAT_PAGE_SIZE
+        self.has_newer_messages = False
+        self.messages = page[-CHAT_PAGE_SIZE:]
+
+    def _trim_window_start(self):
+        if len(self.messages) > CHAT_WINDOW_SIZE:
+            self.messages = self.messages[-CHAT_WINDOW_SIZE:]
+            self.has_older_messages = True
+
     @rx.event
     async def load_history(self):
-        """Load chat history and token usage."""
+        """Load the latest page of chat history and token usage."""
         auth_state = await self.get_state(AuthState)
         if not auth_state.is_authenticated:
             return
         with rx.session() as session:
-            query = (
-                select(ChatMessage)
-                .where(ChatMessage.user_id == auth_state.user_id)
-                .order_by(ChatMessage.created_at)
-            )
-            self.messages = session.exec(query).all()
+            self._load_latest_page(session, auth_state.user_id)
             billing = session.exec(
                 select(Billing).where(Billing.user_id == auth_state.user_id)
             ).first()
             if billing:
                 self.current_month_tokens = billing.current_month_tokens
 
+    @rx.event
+    async def load_older_messages(self):
+        """Prepend the previous page of history, keeping the window bounded."""
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.is_authenticated or not self.messages:
+            return
+        with rx.session() as session:
+            page = _history_page(session, auth_state.user_id, before=self.messages[0])
+        self.has_older_messages = len(page) > CHAT_PAGE_SIZE
+        self.messages = page[-CHAT_PAGE_SIZE:] + self.messages
+        if len(self.messages) > CHAT_WINDOW_SIZE:
+            self.messages = self.messages[:CHAT_WINDOW_SIZE]
+            self.has_newer_messages = True
+
+    @rx.event
+    async def load_newer_messages(self):
+        """Append the next page of history, keeping the window bounded."""
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.is_authenticated or not self.messages:
+            return
+        with rx.session() as session:
+            page = _history_page(session, auth_state.user_id, after=self.messages[-1])
+        self.has_newer_messages = len(page) > CHAT_PAGE_SIZE
+        self.messages = self.messages + page[:CHAT_PAGE_SIZE]
+        self._trim_window_start()
+
     @rx.event
     async def send_message(self, form_data: dict):
-        """Send message to Gemini with RAG context."""
+        """Send message to Gemini with RAG context, streaming the reply."""
         user_query = form_data.get("message", "")
         if not user_query.strip():
             return
@@ -48,57 +125,83 @@ class ChatState(rx.State):
             session.add(user_msg)
             session.commit()
             session.refresh(user_msg)
-        self.messages.append(user_msg)
+            if self.has_newer_messages:
+                self._load_latest_page(session, auth_state.user_id)
+        if not self.messages or self.messages[-1].id != user_msg.id:
+            self.messages.append(user_msg)
+        self._trim_window_start()
         yield
         context_text = ""
         with rx.session() as session:
-            docs = session.exec(
-                select(Document)
-                .where(Document.user_id == auth_state.user_id)
-                .where(Document.extracted_text != None)
-            ).all()
-            relevant_chunks = []
-            query_terms = user_query.lower().split()
-            for doc in docs:
-                if not doc.extracted_text:
-                    continue
-                score = sum(
-                    (1 for term in query_terms if term in doc.extracted_text.lower())
-                )
-                if score > 0:
-                    relevant_chunks.append((score, doc.extracted_text))
-            relevant_chunks.sort(key=lambda x: x[0], reverse=True)
+            chunks = retrieve_context_chunks(session, auth_state.user_id, user_query)
             context_text = """
 
 ---
 
-""".join([chunk[1] for chunk in relevant_chunks[:3]])
-        try:
-            api_key = os.getenv("GOOGLE_API_KEY")
-            if not api_key:
-                raise Exception("Google API Key not configured")
-            client = genai.Client(api_key=api_key)
-            system_instruction = "You are a helpful fiscal assistant for Brazilian MEIs (Microentrepreneurs). Answer the user's question accurately. If relevant document context is provided below, strictly use it to answer. If the context doesn't contain the answer, say so but try to help with general knowledge."
-            full_prompt = user_query
-            if context_text:
-                full_prompt = f"Context from user documents:\n{context_text}\n\nUser Question: {user_query}"
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction
-                ),
+""".join([chunk.content for chunk in chunks])
+            summary_text, history = build_conversation_context(
+                session, auth_state.user_id, user_msg.id
             )
-            response_text = response.text
-            tokens_used = 0
-            if response.usage_metadata:
-                tokens_used = response.usage_metadata.total_token_count
+        conversation = [f"{message.role}: {message.content}" for message in history]
+        if summary_text:
+            conversation.insert(0, f"summary: {summary_text}")
+        fingerprint = context_fingerprint(
+            [chunk.content for chunk in chunks]
+            + [context_fingerprint(conversation) if conversation else ""]
+        )
+        response_text = await get_cached_answer(user_query, fingerprint)
+        tokens_used = 0
+        if response_text is None:
+            response_text = ""
+            try:
+                client = get_llm_client()
+                system_instruction = "You are a helpful fiscal assistant for Brazilian MEIs (Microentrepreneurs). Answer the user's question accurately. If relevant document context is provided below, strictly use it to answer. If the context doesn't contain the answer, say so but try to help with general knowledge."
+                full_prompt = user_query
+                if context_text:
+                    full_prompt = f"Context from user documents:\n{context_text}\n\nUser Question: {user_query}"
+                if summary_text:
+                    system_instruction += (
+                        f"\n\nSummary of the earlier conversation:\n{summary_text}"
+                    )
+                contents = [
+                    {"role": message.role, "parts": [{"text": message.content}]}
+                    for message in history
+                ] + [{"role": "user", "parts": [{"text": full_prompt}]}]
+                stream = await client.aio.models.generate_content_stream(
+                    model=LLM_MODEL,
+                    contents=contents,
+                    config=types.GenerateContentConfig(
+                        system_instruction=system_instruction
+                    ),
+                )
+                usage_metadata = None
+                async for chunk in stream:
+                    if chunk.usage_metadata:
+                        usage_metadata = chunk.usage_metadata
+                    if not chunk.text:
+                        continue
+                    if not self.is_streaming:
+                        self.messages.append(
+                            ChatMessage(
+                                user_id=auth_state.user_id, role="model", content=""
+                            )
+                        )
+                        self.is_loading = False
+                        self.is_streaming = True
+                    response_text += chunk.text
+                    self.messages[-1].content = response_text
+                    yield
+                if usage_metadata and usage_metadata.total_token_count:
+                    tokens_used = usage_metadata.total_token_count
+                else:
+                    tokens_used = len(response_text.split()) + len(full_prompt.split())
+            except Exception as e:
+                logging.exception(f"Gemini API Error: {e}")
+                response_text = "I apologize, but I encountered an error processing your request. Please try again later."
+                tokens_used = 0
             else:
-                tokens_used = len(response_text.split()) + len(full_prompt.split())
-        except Exception as e:
-            logging.exception(f"Gemini API Error: {e}")
-            response_text = "I apologize, but I encountered an error processing your request. Please try again later."
-            tokens_used = 0
+                if response_text:
+                    await store_answer(user_query, fingerprint, response_text)
         with rx.session() as session:
             bot_msg = ChatMessage(
                 user_id=auth_state.user_id,
@@ -121,5 +224,13 @@ class ChatState(rx.State):
             session.commit()
             session.refresh(bot_msg)
             self.current_month_tokens = billing.current_month_tokens
-        self.messages.append(bot_msg)
-        self.is_loading = False
\ No newline at end of file
+        if self.is_streaming:
+            self.messages[-1] = bot_msg
+        else:
+            self.messages.append(bot_msg)
+        self.is_loading = False
+        self.is_streaming = False
+        try:
+            summarize_conversation.delay(auth_state.user_id)
+        except Exception as e:
+            logging.exception(f"Failed to schedule conversation summary: {e}")
\ No newline at end of file
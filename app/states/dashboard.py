@@ -1,13 +1,32 @@
 import reflex as rx
-from sqlmodel import select
+import asyncio
+from sqlmodel import select, func
 from datetime import datetime, date
 import logging
 from app.models import Revenue
 from app.states.auth import AuthState
+from app.services.revenue import apply_revenue_delta, get_monthly_totals
+from app.services.revenue_import import import_revenue_statement
+
+REVENUE_PAGE_SIZE = 10
+REVENUE_SORT_COLUMNS = {"date": Revenue.date, "amount": Revenue.amount}
+
+
+def _import_statement(user_id: int, stream, filename: str) -> dict:
+    """Import one statement in its own session, for running off the event loop."""
+    with rx.session() as session:
+        return import_revenue_statement(session, user_id, stream, filename)
 
 
 class DashboardState(rx.State):
     revenue_entries: list[Revenue] = []
+    total_entries: int = 0
+    page: int = 1
+    filter_start_date: str = ""
+    filter_end_date: str = ""
+    filter_category: str = ""
+    sort_by: str = "date"
+    sort_desc: bool = True
     chart_data: list[dict] = []
     current_month_revenue: float = 0.0
     annual_revenue: float = 0.0
@@ -18,6 +37,9 @@ class DashboardState(rx.State):
     new_entry_description: str = ""
     new_entry_category: str = "Service"
     new_entry_date: str = datetime.now().strftime("%Y-%m-%d")
+    import_upload_id: str = "revenue_import"
+    is_import_modal_open: bool = False
+    is_importing: bool = False
 
     @rx.event
     async def load_data(self):
@@ -27,29 +49,109 @@ class DashboardState(rx.State):
             return
         user_id = auth_state.user_id
         with rx.session() as session:
-            query = (
-                select(Revenue)
-                .where(Revenue.user_id == user_id)
-                .order_by(Revenue.date.desc())
-            )
-            self.revenue_entries = session.exec(query).all()
-        self.calculate_stats()
-        self.prepare_chart_data()
+            self._load_page(session, user_id)
+            monthly_totals = get_monthly_totals(session, user_id, datetime.now().year)
+        self._calculate_stats(monthly_totals)
+        self._prepare_chart_data(monthly_totals)
+
+    @rx.var
+    def total_pages(self) -> int:
+        return max((self.total_entries + REVENUE_PAGE_SIZE - 1) // REVENUE_PAGE_SIZE, 1)
+
+    def _filtered(self, query, user_id: int):
+        query = query.where(Revenue.user_id == user_id)
+        try:
+            if self.filter_start_date:
+                query = query.where(
+                    Revenue.date >= date.fromisoformat(self.filter_start_date)
+                )
+            if self.filter_end_date:
+                query = query.where(
+                    Revenue.date <= date.fromisoformat(self.filter_end_date)
+                )
+        except ValueError as e:
+            logging.exception(f"Invalid revenue date filter: {e}")
+        if self.filter_category:
+            query = query.where(Revenue.category == self.filter_category)
+        return query
+
+    def _load_page(self, session, user_id: int):
+        """Load the current page of revenue entries and the filtered total."""
+        self.total_entries = session.exec(
+            self._filtered(select(func.count(Revenue.id)), user_id)
+        ).one()
+        self.page = min(max(self.page, 1), self.total_pages)
+        column = REVENUE_SORT_COLUMNS.get(self.sort_by, Revenue.date)
+        order = column.desc() if self.sort_desc else column.asc()
+        query = (
+            self._filtered(select(Revenue), user_id)
+            .order_by(order, Revenue.id.desc())
+            .offset((self.page - 1) * REVENUE_PAGE_SIZE)
+            .limit(REVENUE_PAGE_SIZE)
+        )
+        self.revenue_entries = session.exec(query).all()
+
+    @rx.event
+    async def load_revenue_page(self):
+        """Reload only the revenue table for the current page, filters and sort."""
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.is_authenticated or auth_state.user_id == -1:
+            return
+        with rx.session() as session:
+            self._load_page(session, auth_state.user_id)
+
+    @rx.event
+    def set_filter_start_date(self, value: str):
+        self.filter_start_date = value
+        self.page = 1
+        return DashboardState.load_revenue_page
+
+    @rx.event
+    def set_filter_end_date(self, value: str):
+        self.filter_end_date = value
+        self.page = 1
+        return DashboardState.load_revenue_page
+
+    @rx.event
+    def set_filter_category(self, value: str):
+        self.filter_category = value
+        self.page = 1
+        return DashboardState.load_revenue_page
 
     @rx.event
-    def calculate_stats(self):
+    def clear_filters(self):
+        self.filter_start_date = ""
+        self.filter_end_date = ""
+        self.filter_category = ""
+        self.page = 1
+        return DashboardState.load_revenue_page
+
+    @rx.event
+    def sort_revenue(self, column: str):
+        if self.sort_by == column:
+            self.sort_desc = not self.sort_desc
+        else:
+            self.sort_by = column
+            self.sort_desc = True
+        self.page = 1
+        return DashboardState.load_revenue_page
+
+    @rx.event
+    def next_page(self):
+        if self.page < self.total_pages:
+            self.page += 1
+            return DashboardState.load_revenue_page
+
+    @rx.event
+    def prev_page(self):
+        if self.page > 1:
+            self.page -= 1
+            return DashboardState.load_revenue_page
+
+    def _calculate_stats(self, monthly_totals: dict[int, float]):
         """Calculate dashboard statistics."""
-        now = datetime.now()
-        current_month = now.month
-        current_year = now.year
-        self.current_month_revenue = 0.0
-        self.annual_revenue = 0.0
-        for entry in self.revenue_entries:
-            entry_date = datetime.strptime(entry.date, "%Y-%m-%d").date()
-            if entry_date.year == current_year:
-                self.annual_revenue += entry.amount
-                if entry_date.month == current_month:
-                    self.current_month_revenue += entry.amount
+        self.current_month_revenue = monthly_totals.get(datetime.now().month, 0.0)
+        self.annual_revenue = sum(monthly_totals.values())
         limit = 81000.0
         self.mei_limit_percent = self.annual_revenue / limit * 100
         if self.mei_limit_percent >= 100:
@@ -59,10 +161,8 @@ class DashboardState(rx.State):
         else:
             self.limit_status = "green"
 
-    @rx.event
-    def prepare_chart_data(self):
+    def _prepare_chart_data(self, monthly_totals: dict[int, float]):
         """Prepare data for the revenue chart (monthly breakdown)."""
-        current_year = datetime.now().year
         months = [
             "Jan",
             "Feb",
@@ -77,13 +177,9 @@ class DashboardState(rx.State):
             "Nov",
             "Dec",
         ]
-        monthly_totals = {i: 0.0 for i in range(1, 13)}
-        for entry in self.revenue_entries:
-            entry_date = datetime.strptime(entry.date, "%Y-%m-%d").date()
-            if entry_date.year == current_year:
-                monthly_totals[entry_date.month] += entry.amount
         self.chart_data = [
-            {"name": months[i - 1], "revenue": monthly_totals[i]} for i in range(1, 13)
+            {"name": months[i - 1], "revenue": monthly_totals.get(i, 0.0)}
+            for i in range(1, 13)
         ]
 
     @rx.event
@@ -114,8 +210,9 @@ class DashboardState(rx.State):
             return
         try:
             amount = float(self.new_entry_amount)
+            entry_date = date.fromisoformat(self.new_entry_date)
         except ValueError as e:
-            logging.exception(f"Error converting amount to float: {e}")
+            logging.exception(f"Error parsing revenue entry: {e}")
             return
         with rx.session() as session:
             new_revenue = Revenue(
@@ -123,21 +220,128 @@ class DashboardState(rx.State):
                 amount=amount,
                 description=self.new_entry_description,
                 category=self.new_entry_category,
-                date=self.new_entry_date,
+                date=entry_date,
             )
             session.add(new_revenue)
+            apply_revenue_delta(session, auth_state.user_id, entry_date, amount)
             session.commit()
+            session.refresh(new_revenue)
         self.new_entry_amount = ""
         self.new_entry_description = ""
         self.is_add_modal_open = False
-        return DashboardState.load_data
+        if not self.chart_data:
+            return DashboardState.load_data
+        self._apply_stats_delta(entry_date, amount)
+        if not self._insert_entry(new_revenue):
+            return DashboardState.load_revenue_page
 
     @rx.event
-    def delete_revenue(self, revenue_id: int):
+    async def delete_revenue(self, revenue_id: int):
         """Delete a revenue entry."""
+        auth_state = await self.get_state(AuthState)
         with rx.session() as session:
             revenue = session.get(Revenue, revenue_id)
-            if revenue:
-                session.delete(revenue)
-                session.commit()
-        return DashboardState.load_data
\ No newline at end of file
+            if not revenue or revenue.user_id != auth_state.user_id:
+                return
+            entry_date, amount = revenue.date, revenue.amount
+            apply_revenue_delta(session, revenue.user_id, entry_date, amount, count=-1)
+            session.delete(revenue)
+            session.commit()
+        if not self.chart_data:
+            return DashboardState.load_data
+        self._apply_stats_delta(entry_date, -amount)
+        if not self._remove_entry(revenue_id):
+            return DashboardState.load_revenue_page
+
+    def _matches_filters(self, revenue: Revenue) -> bool:
+        """Python mirror of _filtered for a single entry."""
+        try:
+            if self.filter_start_date and revenue.date < date.fromisoformat(
+                self.filter_start_date
+            ):
+                return False
+            if self.filter_end_date and revenue.date > date.fromisoformat(
+                self.filter_end_date
+            ):
+                return False
+        except ValueError:
+            pass
+        return not self.filter_category or revenue.category == self.filter_category
+
+    def _apply_stats_delta(self, entry_date: date, amount: float):
+        """Shift the chart and headline stats by one entry's amount."""
+        if entry_date.year != datetime.now().year:
+            return
+        monthly_totals = {
+            month: row["revenue"] for month, row in enumerate(self.chart_data, start=1)
+        }
+        monthly_totals[entry_date.month] = round(
+            monthly_totals[entry_date.month] + amount, 2
+        )
+        self._calculate_stats(monthly_totals)
+        self._prepare_chart_data(monthly_totals)
+
+    def _insert_entry(self, revenue: Revenue) -> bool:
+        """Place a new entry on the current page, or return False if it must be reloaded.
+
+        Only the first page can be updated in place; on later pages the new
+        row shifts entries in from the previous page.
+        """
+        if not self._matches_filters(revenue):
+            return True
+        self.total_entries += 1
+        if self.page != 1:
+            return False
+        column = self.sort_by if self.sort_by in REVENUE_SORT_COLUMNS else "date"
+        entries = sorted(
+            [revenue, *self.revenue_entries], key=lambda entry: entry.id, reverse=True
+        )
+        entries.sort(key=lambda entry: getattr(entry, column), reverse=self.sort_desc)
+        self.revenue_entries = entries[:REVENUE_PAGE_SIZE]
+        return True
+
+    def _remove_entry(self, revenue_id: int) -> bool:
+        """Drop an entry from the current page, or return False if it must be reloaded.
+
+        The page is reloaded when a following page has a row to pull up, or
+        when the last row of a later page was removed.
+        """
+        remaining = [entry for entry in self.revenue_entries if entry.id != revenue_id]
+        if len(remaining) == len(self.revenue_entries):
+            return False
+        self.total_entries -= 1
+        self.revenue_entries = remaining
+        return (bool(remaining) or self.page == 1) and (
+            self.total_entries < self.page * REVENUE_PAGE_SIZE
+        )
+
+    @rx.event
+    def set_import_modal_open(self, value: bool):
+        self.is_import_modal_open = value
+
+    @rx.event
+    async def handle_revenue_import(self, files: list[rx.UploadFile]):
+        """Bulk import revenue entries from CSV/OFX statements."""
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.is_authenticated or auth_state.user_id == -1:
+            return
+        self.is_importing = True
+        yield
+        totals = {"imported": 0, "duplicates": 0, "skipped": 0, "invalid": 0}
+        for file in files:
+            try:
+                result = await asyncio.to_thread(
+                    _import_statement, auth_state.user_id, file.file, file.name
+                )
+                for key, value in result.items():
+                    totals[key] += value
+            except Exception as e:
+                logging.exception(f"Revenue import failed for {file.name}: {e}")
+                yield rx.toast.error(f"Failed to import {file.name}")
+        self.is_importing = False
+        self.is_import_modal_open = False
+        yield rx.clear_selected_files(self.import_upload_id)
+        yield rx.toast.success(
+            f"Imported {totals['imported']} entries ({totals['duplicates']} duplicates, {totals['skipped'] + totals['invalid']} skipped)"
+        )
+        yield DashboardState.load_data
\ No newline at end of file
@@ -1,19 +1,60 @@
 import reflex as rx
+import asyncio
 from sqlmodel import select
 import logging
 from app.models import Document
 from app.states.auth import AuthState
-from app.services.storage import StorageService
-from app.tasks import process_document_ocr
+from app.services.storage import get_storage, hash_stream
+from app.services.chunking import delete_document_chunks, replace_document_chunks
+from app.tasks import (
+    embed_document_chunks,
+    process_documents_ocr_batch,
+    OCR_BATCH_SIZE,
+)
 import random
 import string
 
 
+def _find_duplicate(
+    session, user_id: int, content_hash: str
+) -> tuple[str | None, str | None]:
+    """Return the user's stored object and any finished OCR text for a content hash.
+
+    Both lookups are scoped to the user's own documents, so an upload never
+    reveals whether another customer already holds the same file.
+    """
+    minio_path = session.exec(
+        select(Document.minio_path)
+        .where(Document.user_id == user_id)
+        .where(Document.content_hash == content_hash)
+    ).first()
+    ocr_text = session.exec(
+        select(Document.extracted_text)
+        .where(Document.user_id == user_id)
+        .where(Document.content_hash == content_hash)
+        .where(Document.status == "completed")
+        .where(Document.extracted_text != None)
+    ).first()
+    return minio_path, ocr_text
+
+
+def _storage_available() -> bool:
+    """Probe storage; the first check does network I/O, so run it in a thread."""
+    return get_storage().is_available
+
+
+def _delete_object(minio_path: str):
+    storage = get_storage()
+    if storage.is_available:
+        storage.delete_file(minio_path)
+
+
 class DocumentState(rx.State):
     documents: list[Document] = []
     upload_id: str = "upload_area"
     is_uploading: bool = False
     preview_url: str = ""
+    preview_urls: dict[str, str] = {}
     preview_text: str = ""
     is_preview_open: bool = False
 
@@ -30,6 +71,14 @@ class DocumentState(rx.State):
                 .order_by(Document.created_at.desc())
             )
             self.documents = session.exec(query).all()
+        image_paths = {
+            doc.minio_path
+            for doc in self.documents
+            if doc.content_type and "image" in doc.content_type
+        }
+        self.preview_urls = await asyncio.to_thread(
+            get_storage().get_file_urls, list(image_paths)
+        )
 
     @rx.event
     async def handle_upload(self, files: list[rx.UploadFile]):
@@ -37,70 +86,106 @@ class DocumentState(rx.State):
         auth_state = await self.get_state(AuthState)
         if not auth_state.is_authenticated:
             return
-        storage = StorageService()
-        if not storage.is_available:
+        if not await asyncio.to_thread(_storage_available):
             yield rx.toast.error(
                 "Document storage is currently unavailable. Upload disabled.",
                 duration=5000,
                 close_button=True,
             )
             return
+        storage = get_storage()
         self.is_uploading = True
+        new_docs = []
+        stored_paths = {}
         for file in files:
             try:
-                upload_data = await file.read()
-                ext = file.name.split(".")[-1]
-                random_str = "".join(
-                    random.choices(string.ascii_letters + string.digits, k=8)
+                file_size, content_hash = await asyncio.to_thread(
+                    hash_stream, file.file
                 )
-                unique_filename = f"{auth_state.user_id}/{random_str}_{file.name}"
-                storage.upload_file(upload_data, unique_filename, file.content_type)
                 with rx.session() as session:
-                    new_doc = Document(
-                        user_id=auth_state.user_id,
-                        filename=file.name,
-                        minio_path=unique_filename,
-                        file_size=len(upload_data),
-                        content_type=file.content_type,
-                        status="pending",
+                    minio_path, ocr_text = _find_duplicate(
+                        session, auth_state.user_id, content_hash
+                    )
+                minio_path = stored_paths.get(content_hash) or minio_path
+                if not minio_path:
+                    random_str = "".join(
+                        random.choices(string.ascii_letters + string.digits, k=8)
+                    )
+                    minio_path = f"{auth_state.user_id}/{random_str}_{file.name}"
+                    await asyncio.to_thread(
+                        storage.upload_stream, file.file, minio_path, file.content_type
                     )
+                stored_paths[content_hash] = minio_path
+                new_doc = Document(
+                    user_id=auth_state.user_id,
+                    filename=file.name,
+                    minio_path=minio_path,
+                    file_size=file_size,
+                    content_type=file.content_type,
+                    content_hash=content_hash,
+                    status="pending",
+                )
+                if ocr_text is None:
+                    new_docs.append(new_doc)
+                    continue
+                new_doc.status = "completed"
+                new_doc.extracted_text = ocr_text
+                with rx.session() as session:
                     session.add(new_doc)
+                    session.flush()
+                    replace_document_chunks(
+                        session, new_doc.id, new_doc.user_id, ocr_text
+                    )
                     session.commit()
-                    session.refresh(new_doc)
-                    process_document_ocr.delay(new_doc.id)
+                    embed_document_chunks.delay(new_doc.id)
             except Exception as e:
                 logging.exception(f"Upload failed: {e}")
                 yield rx.toast.error(f"Failed to upload {file.name}")
+        if new_docs:
+            try:
+                with rx.session() as session:
+                    session.add_all(new_docs)
+                    session.commit()
+                    document_ids = [doc.id for doc in new_docs]
+                for i in range(0, len(document_ids), OCR_BATCH_SIZE):
+                    process_documents_ocr_batch.delay(
+                        document_ids[i : i + OCR_BATCH_SIZE]
+                    )
+            except Exception as e:
+                logging.exception(f"Failed to queue uploaded documents: {e}")
+                yield rx.toast.error("Failed to queue uploaded documents for OCR")
         self.is_uploading = False
         yield rx.toast.success("Files uploaded successfully")
         yield DocumentState.load_documents
         return
 
     @rx.event
-    def delete_document(self, doc_id: int, minio_path: str):
+    async def delete_document(self, doc_id: int, minio_path: str):
         """Delete document from DB and MinIO."""
         try:
-            storage = StorageService()
-            if storage.is_available:
-                storage.delete_file(minio_path)
             with rx.session() as session:
                 doc = session.get(Document, doc_id)
                 if doc:
+                    delete_document_chunks(session, doc.id)
                     session.delete(doc)
                     session.commit()
+                shared = session.exec(
+                    select(Document.id).where(Document.minio_path == minio_path)
+                ).first()
+            if not shared:
+                await asyncio.to_thread(_delete_object, minio_path)
             return DocumentState.load_documents
         except Exception as e:
             logging.exception(f"Delete failed: {e}")
             return rx.toast.error("Failed to delete document")
 
     @rx.event
-    def open_preview(self, doc: Document):
+    async def open_preview(self, doc: Document):
         """Open document preview modal."""
-        storage = StorageService()
-        if storage.is_available:
-            self.preview_url = storage.get_file_url(doc.minio_path)
-        else:
-            self.preview_url = ""
+        self.preview_url = await asyncio.to_thread(
+            get_storage().get_file_url, doc.minio_path
+        )
+        if not self.preview_url:
             yield rx.toast.warning("Storage unavailable. Preview image not loaded.")
         self.preview_text = doc.extracted_text or "No text extracted yet."
         self.is_preview_open = True
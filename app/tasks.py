@@ -1,40 +1,278 @@
 import reflex as rx
-from app.celery_app import celery_app
-from app.models import Document
-from app.services.storage import StorageService
-from sqlmodel import Session, create_engine, select
-import pytesseract
-from PIL import Image
-import io
+from app.celery_app import celery_app, CELERY_OCR_TIME_LIMIT
+from celery.exceptions import SoftTimeLimitExceeded
+from app.db import get_engine
+from app.models import Document, DocumentChunk, ConversationSummary
+from app.services.storage import StorageService, get_storage
+from app.services.chunking import replace_document_chunks
+from app.services.ocr import extract_text
+from app.services.vector_index import store_chunk_embeddings
+from app.services.llm import get_llm_client, LLM_MODEL
+from app.services.conversation import (
+    CHAT_SUMMARY_BATCH,
+    CHAT_SUMMARY_MAX_CHARS,
+    get_summary,
+    pending_summary_messages,
+    summary_prompt,
+)
+from sqlmodel import Session, select, update, func, or_, and_
+from sqlalchemy import bindparam
 import os
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from datetime import datetime, timedelta
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///reflex.db")
-engine = create_engine(DATABASE_URL)
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "16"))
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", str(os.cpu_count() or 2)))
+OCR_MAX_ATTEMPTS = int(os.getenv("OCR_MAX_ATTEMPTS", "3"))
+_SET_STATUS = (
+    Document.__table__.update()
+    .where(Document.__table__.c.id == bindparam("document_id"))
+    .values(status=bindparam("status"))
+)
+_SET_COMPLETED = (
+    Document.__table__.update()
+    .where(Document.__table__.c.id == bindparam("document_id"))
+    .values(status="completed", extracted_text=bindparam("extracted_text"))
+)
+
+
+def _extract_text(storage: StorageService, minio_path: str, content_type: str) -> str:
+    with storage.open_file(minio_path) as file:
+        return extract_text(file, content_type)
+
+
+def _stale_claim():
+    """Processing rows whose claim outlived the OCR hard time limit.
+
+    The claiming worker must have died (OOM kill, SIGKILL, hard limit), so
+    the row may be claimed again. Rows claimed before claimed_at existed
+    count as stale too.
+    """
+    expired = datetime.now() - timedelta(seconds=CELERY_OCR_TIME_LIMIT)
+    return and_(
+        Document.status == "processing",
+        or_(Document.claimed_at == None, Document.claimed_at < expired),
+    )
+
+
+def _claim_documents(session, document_ids: list[int]) -> list:
+    """Atomically move claimable documents to processing and return the claimed rows.
+
+    Pending documents and stale claims are claimable, up to OCR_MAX_ATTEMPTS
+    times each. Documents another worker is still processing (e.g. on task
+    redelivery) are left alone.
+    """
+    columns = (
+        Document.id,
+        Document.user_id,
+        Document.minio_path,
+        Document.content_type,
+        Document.content_hash,
+    )
+    attempts = func.coalesce(Document.ocr_attempts, 0)
+    claim = (
+        update(Document)
+        .where(or_(Document.status == "pending", _stale_claim()))
+        .where(attempts < OCR_MAX_ATTEMPTS)
+        .values(
+            status="processing", claimed_at=datetime.now(), ocr_attempts=attempts + 1
+        )
+    )
+    if session.get_bind().dialect.update_returning:
+        return session.execute(
+            claim.where(Document.id.in_(document_ids)).returning(*columns)
+        ).all()
+    claimed = [
+        document_id
+        for document_id in document_ids
+        if session.execute(claim.where(Document.id == document_id)).rowcount
+    ]
+    if not claimed:
+        return []
+    return session.execute(select(*columns).where(Document.id.in_(claimed))).all()
+
+
+def _fail_documents(jobs: list):
+    """Mark documents failed; ones deleted meanwhile are simply not matched."""
+    with Session(get_engine()) as session:
+        session.execute(
+            _SET_STATUS,
+            [
+                {"document_id": document_id, "status": "failed"}
+                for document_id, *_ in jobs
+            ],
+        )
+        session.commit()
+
+
+def _process_documents(document_ids: list[int]):
+    """Download and OCR documents concurrently, writing statuses in bulk.
+
+    Tesseract runs as a subprocess per call, so a thread pool keeps
+    OCR_CONCURRENCY recognitions (and their downloads) in flight at once.
+    Content the same user already had OCRed (same content hash) is reused
+    instead, and a user's identical files within a batch are recognized
+    only once. No database connection is held while OCR runs.
+    """
+    with Session(get_engine()) as session:
+        jobs = _claim_documents(session, document_ids)
+        hashes = {(job[1], job[4]) for job in jobs if job[4]}
+        texts = {}
+        if hashes:
+            user_ids, content_hashes = zip(*hashes)
+            rows = session.exec(
+                select(Document.user_id, Document.content_hash, Document.extracted_text)
+                .where(Document.user_id.in_(set(user_ids)))
+                .where(Document.content_hash.in_(set(content_hashes)))
+                .where(Document.status == "completed")
+                .where(Document.extracted_text != None)
+            ).all()
+            texts = {
+                (user_id, content_hash): text for user_id, content_hash, text in rows
+            }
+        session.commit()
+    skipped = set(document_ids) - {job[0] for job in jobs}
+    if skipped:
+        logging.warning(f"Skipping missing or already claimed documents {skipped}")
+    if not jobs:
+        return
+    storage = get_storage()
+
+    def run(job):
+        document_id, _, minio_path, content_type, _ = job
+        try:
+            return _extract_text(storage, minio_path, content_type)
+        except Exception as e:
+            logging.exception(f"OCR Processing failed for document {document_id}: {e}")
+            return None
+
+    pending = {}
+    for job in jobs:
+        key = (job[1], job[4]) if job[4] else job[0]
+        if key not in texts:
+            pending.setdefault(key, job)
+    if pending:
+        pool = ThreadPoolExecutor(max_workers=min(OCR_CONCURRENCY, len(pending)))
+        try:
+            texts.update(zip(pending, pool.map(run, pending.values())))
+        except SoftTimeLimitExceeded:
+            logging.error(f"OCR batch timed out for documents {document_ids}")
+            _fail_documents(jobs)
+            raise
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    failed = []
+    completed = []
+    with Session(get_engine()) as session:
+        existing = set(
+            session.exec(
+                select(Document.id).where(Document.id.in_([job[0] for job in jobs]))
+            ).all()
+        )
+        for document_id, user_id, *_, content_hash in jobs:
+            if document_id not in existing:
+                logging.info(f"Document {document_id} was deleted during OCR")
+                continue
+            text = texts.get((user_id, content_hash) if content_hash else document_id)
+            if text is not None:
+                try:
+                    with session.begin_nested():
+                        replace_document_chunks(session, document_id, user_id, text)
+                    completed.append(
+                        {"document_id": document_id, "extracted_text": text}
+                    )
+                    continue
+                except Exception as e:
+                    logging.exception(
+                        f"Indexing failed for document {document_id}: {e}"
+                    )
+            failed.append({"document_id": document_id, "status": "failed"})
+        if completed:
+            session.execute(_SET_COMPLETED, completed)
+        if failed:
+            session.execute(_SET_STATUS, failed)
+        session.commit()
+    for row in completed:
+        embed_document_chunks.delay(row["document_id"])
 
 
 @celery_app.task(name="app.tasks.process_document_ocr")
 def process_document_ocr(document_id: int):
     """Background task to process OCR for a document."""
-    storage = StorageService()
-    with Session(engine) as session:
-        document = session.get(Document, document_id)
-        if not document:
-            logging.error(f"Document {document_id} not found")
+    _process_documents([document_id])
+
+
+@celery_app.task(name="app.tasks.process_documents_ocr_batch")
+def process_documents_ocr_batch(document_ids: list[int]):
+    """Background task to process OCR for a batch of documents."""
+    _process_documents(document_ids)
+
+
+@celery_app.task(name="app.tasks.requeue_stale_documents")
+def requeue_stale_documents():
+    """Periodic task to retry OCR for documents whose worker died mid-batch.
+
+    Documents that already used OCR_MAX_ATTEMPTS claims are marked failed
+    instead, so a file that crashes the worker every time is not retried forever.
+    """
+    with Session(get_engine()) as session:
+        rows = session.exec(
+            select(Document.id, Document.ocr_attempts).where(_stale_claim())
+        ).all()
+        exhausted = [
+            {"document_id": document_id, "status": "failed"}
+            for document_id, attempts in rows
+            if (attempts or 0) >= OCR_MAX_ATTEMPTS
+        ]
+        if exhausted:
+            session.execute(_SET_STATUS, exhausted)
+            session.commit()
+    retry = [
+        document_id
+        for document_id, attempts in rows
+        if (attempts or 0) < OCR_MAX_ATTEMPTS
+    ]
+    if exhausted:
+        logging.warning(
+            f"Gave up OCR after {OCR_MAX_ATTEMPTS} attempts for documents {[row['document_id'] for row in exhausted]}"
+        )
+    for i in range(0, len(retry), OCR_BATCH_SIZE):
+        process_documents_ocr_batch.delay(retry[i : i + OCR_BATCH_SIZE])
+
+
+@celery_app.task(name="app.tasks.embed_document_chunks")
+def embed_document_chunks(document_id: int):
+    """Background task to compute vector embeddings for a document's chunks."""
+    with Session(get_engine()) as session:
+        chunks = session.exec(
+            select(DocumentChunk).where(DocumentChunk.document_id == document_id)
+        ).all()
+        if not chunks:
             return
         try:
-            document.status = "processing"
-            session.add(document)
+            store_chunk_embeddings(session, chunks)
             session.commit()
-            file_data = storage.get_file_content(document.minio_path)
-            image = Image.open(io.BytesIO(file_data))
-            text = pytesseract.image_to_string(image)
-            document.extracted_text = text
-            document.status = "completed"
-            session.add(document)
+        except Exception as e:
+            logging.exception(f"Embedding failed for document {document_id}: {e}")
+
+
+@celery_app.task(name="app.tasks.summarize_conversation")
+def summarize_conversation(user_id: int):
+    """Background task to fold old chat turns into the user's rolling summary."""
+    with Session(get_engine()) as session:
+        pending = pending_summary_messages(session, user_id)
+        if len(pending) < CHAT_SUMMARY_BATCH:
+            return
+        summary = get_summary(session, user_id) or ConversationSummary(user_id=user_id)
+        try:
+            response = get_llm_client().models.generate_content(
+                model=LLM_MODEL, contents=summary_prompt(summary.summary, pending)
+            )
+            summary.summary = (response.text or "").strip()[:CHAT_SUMMARY_MAX_CHARS]
+            summary.last_message_id = pending[-1].id
+            summary.updated_at = datetime.now()
+            session.add(summary)
             session.commit()
         except Exception as e:
-            logging.exception(f"OCR Processing failed for document {document_id}: {e}")
-            document.status = "failed"
-            session.add(document)
-            session.commit()
\ No newline at end of file
+            logging.exception(f"Conversation summary failed for user {user_id}: {e}")
\ No newline at end of file
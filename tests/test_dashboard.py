@@ -0,0 +1,180 @@
+from collections import defaultdict
+from datetime import date, datetime
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.models import Revenue
+from app.services.revenue import (
+    apply_revenue_batch,
+    apply_revenue_delta,
+    get_monthly_totals,
+)
+from app.states.dashboard import REVENUE_PAGE_SIZE, DashboardState
+
+YEAR = datetime.now().year
+VIEWS = [
+    {},
+    {"page": 2},
+    {"page": 3},
+    {"sort_by": "amount", "sort_desc": False},
+    {"sort_by": "amount", "page": 2},
+    {"filter_category": "Service"},
+    {"filter_start_date": f"{YEAR}-03-01", "filter_end_date": f"{YEAR}-08-31"},
+]
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        rows = [
+            Revenue(
+                user_id=1,
+                amount=100 + i * 37.25,
+                description=f"Entry {i}",
+                category="Service" if i % 3 else "Product",
+                date=date(YEAR, i % 12 + 1, i % 27 + 1),
+            )
+            for i in range(27)
+        ]
+        rows.append(
+            Revenue(
+                user_id=1,
+                amount=999.0,
+                description="Last year",
+                category="Service",
+                date=date(YEAR - 1, 12, 31),
+            )
+        )
+        session.add_all(rows)
+        apply_revenue_batch(session, [(1, row.date, row.amount) for row in rows])
+        session.commit()
+        yield session
+
+
+def _view(session, view: dict) -> DashboardState:
+    """A dashboard loaded from scratch, with totals recomputed from every entry."""
+    state = DashboardState(_reflex_internal_init=True)
+    for name, value in view.items():
+        setattr(state, name, value)
+    state._load_page(session, 1)
+    totals = defaultdict(float)
+    for entry_date, amount in session.exec(select(Revenue.date, Revenue.amount)):
+        if entry_date.year == YEAR:
+            totals[entry_date.month] += amount
+    totals = {month: round(total, 2) for month, total in totals.items()}
+    state._calculate_stats(totals)
+    state._prepare_chart_data(totals)
+    return state
+
+
+def _assert_same(state: DashboardState, expected: DashboardState):
+    assert [entry.id for entry in state.revenue_entries] == [
+        entry.id for entry in expected.revenue_entries
+    ]
+    assert state.total_entries == expected.total_entries
+    assert state.page == expected.page
+    assert [row["name"] for row in state.chart_data] == [
+        row["name"] for row in expected.chart_data
+    ]
+    assert [row["revenue"] for row in state.chart_data] == pytest.approx(
+        [row["revenue"] for row in expected.chart_data]
+    )
+    assert state.annual_revenue == pytest.approx(expected.annual_revenue)
+    assert state.current_month_revenue == pytest.approx(expected.current_month_revenue)
+    assert state.limit_status == expected.limit_status
+
+
+def _add(session, state: DashboardState, entry_date: date, amount: float, category):
+    revenue = Revenue(
+        user_id=1,
+        amount=amount,
+        description="New",
+        category=category,
+        date=entry_date,
+    )
+    session.add(revenue)
+    apply_revenue_delta(session, 1, entry_date, amount)
+    session.commit()
+    session.refresh(revenue)
+    state._apply_stats_delta(entry_date, amount)
+    if not state._insert_entry(revenue):
+        state._load_page(session, 1)
+
+
+def _delete(session, state: DashboardState, revenue: Revenue):
+    revenue_id, entry_date, amount = revenue.id, revenue.date, revenue.amount
+    apply_revenue_delta(session, 1, entry_date, amount, count=-1)
+    session.delete(revenue)
+    session.commit()
+    state._apply_stats_delta(entry_date, -amount)
+    if not state._remove_entry(revenue_id):
+        state._load_page(session, 1)
+
+
+@pytest.mark.parametrize("view", VIEWS)
+@pytest.mark.parametrize(
+    "entry_date, amount, category",
+    [
+        (date(YEAR, datetime.now().month, 1), 123.45, "Service"),
+        (date(YEAR, 5, 15), 5000.0, "Product"),
+        (date(YEAR, 1, 1), 1.0, "Service"),
+        (date(YEAR - 1, 6, 1), 80000.0, "Service"),
+    ],
+)
+def test_insert_matches_full_reload(session, view, entry_date, amount, category):
+    state = _view(session, view)
+    _add(session, state, entry_date, amount, category)
+    _assert_same(state, _view(session, view))
+
+
+@pytest.mark.parametrize("view", VIEWS)
+@pytest.mark.parametrize("position", ["first", "on_page", "off_page", "last"])
+def test_delete_matches_full_reload(session, view, position):
+    state = _view(session, view)
+    everything = DashboardState(_reflex_internal_init=True)
+    for name, value in view.items():
+        setattr(everything, name, value)
+    everything.page = 1
+    ordered = []
+    while True:
+        everything._load_page(session, 1)
+        ordered += everything.revenue_entries
+        if everything.page >= everything.total_pages:
+            break
+        everything.page += 1
+    on_page = {entry.id for entry in state.revenue_entries}
+    if position == "first":
+        revenue = ordered[0]
+    elif position == "last":
+        revenue = ordered[-1]
+    elif position == "on_page":
+        revenue = state.revenue_entries[len(state.revenue_entries) // 2]
+    else:
+        revenue = next(entry for entry in ordered if entry.id not in on_page)
+    _delete(session, state, session.get(Revenue, revenue.id))
+    _assert_same(state, _view(session, view))
+
+
+def test_delete_last_row_of_last_page_moves_back_a_page(session):
+    state = _view(session, {"page": 3})
+    assert state.total_entries == 2 * REVENUE_PAGE_SIZE + 8
+    for entry in list(state.revenue_entries):
+        _delete(session, state, session.get(Revenue, entry.id))
+    expected = _view(session, {"page": 3})
+    assert state.page == expected.page == 2
+    _assert_same(state, expected)
+
+
+def test_rollups_match_recompute_after_changes(session):
+    state = _view(session, {})
+    _add(session, state, date(YEAR, 2, 2), 10.5, "Service")
+    _delete(session, state, session.exec(select(Revenue)).first())
+    totals = defaultdict(float)
+    for entry_date, amount in session.exec(select(Revenue.date, Revenue.amount)):
+        if entry_date.year == YEAR:
+            totals[entry_date.month] += amount
+    rollups = get_monthly_totals(session, 1, YEAR)
+    assert {m: round(t, 2) for m, t in rollups.items() if t} == pytest.approx(
+        {m: round(t, 2) for m, t in totals.items()}
+    )
\ No newline at end of file
@@ -0,0 +1,18 @@
+import pytest
+from sqlalchemy import text
+from app.db import create_db_engine, engine_options
+
+
+@pytest.mark.parametrize(
+    "url", ["sqlite://", "sqlite:///:memory:", "sqlite:///file:db?mode=memory&uri=true"]
+)
+def test_in_memory_sqlite_skips_pool_sizing(url):
+    assert "pool_size" not in engine_options(url)
+    with create_db_engine(url).connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+
+
+@pytest.mark.parametrize("url", ["sqlite:///reflex.db", "postgresql://user@host/db"])
+def test_pooled_backends_get_pool_sizing(url):
+    options = engine_options(url)
+    assert {"pool_size", "max_overflow", "pool_timeout"} <= set(options)
\ No newline at end of file
@@ -0,0 +1,28 @@
+import io
+import pytest
+from PIL import Image
+from app.services.ocr import OCR_MAX_PIXELS, OCR_PHOTO_MAX_PIXELS, preprocess_image
+
+
+def _jpeg(size, dpi=None):
+    buffer = io.BytesIO()
+    extra = {"dpi": (dpi, dpi)} if dpi else {}
+    Image.new("RGB", size, (200, 200, 200)).save(buffer, "JPEG", **extra)
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+def test_photo_without_dpi_is_capped():
+    image = preprocess_image(_jpeg((4032, 3024)))
+    assert image.width * image.height <= OCR_PHOTO_MAX_PIXELS
+    assert image.mode == "L"
+
+
+@pytest.mark.parametrize(
+    "size,dpi,expected",
+    [((2480, 3508), 300, (2480, 3508)), ((2480, 3508), 600, (1240, 1754))],
+)
+def test_scan_is_scaled_to_target_dpi(size, dpi, expected):
+    image = preprocess_image(_jpeg(size, dpi))
+    assert image.size == expected
+    assert image.width * image.height <= OCR_MAX_PIXELS
\ No newline at end of file
@@ -0,0 +1,153 @@
+import io
+from datetime import date, timedelta
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.models import Revenue
+from app.services.revenue_import import (
+    _import_hash,
+    import_revenue_statement,
+    iter_csv_rows,
+    iter_ofx_rows,
+    parse_amount,
+    parse_date,
+)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("1.234,56", 1234.56),
+        ("1,234.56", 1234.56),
+        ("R$ 10,00", 10.0),
+        ("R$ 1.500", 1500.0),
+        ("1.234", 1234.0),
+        ("1.234.567", 1234567.0),
+        ("1.234.567,89", 1234567.89),
+        ("1,234", 1234.0),
+        ("-50", -50.0),
+        ("-1.500,00", -1500.0),
+        ("1.5", 1.5),
+        ("0,50", 0.5),
+        ("0.500", 0.5),
+        ("1500.00", 1500.0),
+    ],
+)
+def test_parse_amount(value, expected):
+    assert parse_amount(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "abc", "1.23.4", "1,2,3"])
+def test_parse_amount_rejects_malformed(value):
+    with pytest.raises(ValueError):
+        parse_amount(value)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2025-03-07", date(2025, 3, 7)),
+        ("07/03/2025", date(2025, 3, 7)),
+        ("07/03/25", date(2025, 3, 7)),
+        ("07-03-2025", date(2025, 3, 7)),
+        ("20250307", date(2025, 3, 7)),
+        ("20250307120000[-3:BRT]", date(2025, 3, 7)),
+    ],
+)
+def test_parse_date(value, expected):
+    assert parse_date(value) == expected
+
+
+def test_parse_date_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        parse_date("March 7th")
+
+
+def test_iter_csv_rows_maps_brazilian_headers():
+    lines = iter(
+        [
+            "Data;Histórico;Valor (R$)\n",
+            "07/03/2025;Pix recebido;1.500,00\n",
+            ";;\n",
+            "08/03/2025;Tarifa\n",
+        ]
+    )
+    assert list(iter_csv_rows(lines)) == [
+        {"date": "07/03/2025", "description": "Pix recebido", "amount": "1.500,00"},
+        {"date": "08/03/2025", "description": "Tarifa", "amount": ""},
+    ]
+
+
+def test_iter_csv_rows_requires_date_and_amount():
+    with pytest.raises(ValueError):
+        list(iter_csv_rows(iter(["description,category\n", "x,y\n"])))
+
+
+def test_iter_ofx_rows_reads_sgml_and_xml_blocks():
+    lines = iter(
+        [
+            "<OFX><BANKTRANLIST>\n",
+            "<STMTTRN>\n",
+            "<TRNTYPE>CREDIT\n",
+            "<DTPOSTED>20250307120000[-3:BRT]\n",
+            "<TRNAMT>1500.00\n",
+            "<FITID>abc-1\n",
+            "<MEMO>Pix recebido\n",
+            "</STMTTRN>\n",
+            "<STMTTRN><DTPOSTED>20250308</DTPOSTED><TRNAMT>-10.50</TRNAMT>"
+            "<FITID>abc-2</FITID><NAME>Tarifa</NAME></STMTTRN>\n",
+            "</BANKTRANLIST></OFX>\n",
+        ]
+    )
+    assert list(iter_ofx_rows(lines)) == [
+        {
+            "date": "20250307120000[-3:BRT]",
+            "amount": "1500.00",
+            "description": "Pix recebido",
+            "fitid": "abc-1",
+        },
+        {
+            "date": "20250308",
+            "amount": "-10.50",
+            "description": "Tarifa",
+            "fitid": "abc-2",
+        },
+    ]
+
+
+def test_import_keeps_identical_credits_and_is_idempotent():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    statement = (
+        b"data,descricao,valor\n"
+        b'07/03/2025,Pix recebido,"50,00"\n'
+        b'07/03/2025,Pix recebido,"50,00"\n'
+        b'07/03/2025,Tarifa,"-2,00"\n'
+    )
+    with Session(engine) as session:
+        first = import_revenue_statement(
+            session, 1, io.BytesIO(statement), "extrato.csv"
+        )
+        second = import_revenue_statement(
+            session, 1, io.BytesIO(statement), "extrato.csv"
+        )
+        amounts = session.exec(select(Revenue.amount)).all()
+    assert first == {"imported": 2, "duplicates": 0, "skipped": 1, "invalid": 0}
+    assert second == {"imported": 0, "duplicates": 2, "skipped": 1, "invalid": 0}
+    assert amounts == [50.0, 50.0]
+
+
+def test_occurrence_counter_only_holds_the_current_date():
+    occurrences = {}
+    hashes = set()
+    for day in range(365):
+        entry = {
+            "fitid": "",
+            "date": date(2025, 1, 1) + timedelta(days=day),
+            "amount": 50.0,
+            "description": "Pix recebido",
+        }
+        for _ in range(3):
+            hashes.add(_import_hash(1, entry, occurrences))
+        assert list(occurrences) == [entry["date"]]
+        assert len(occurrences[entry["date"]]) == 1
+    assert len(hashes) == 365 * 3
\ No newline at end of file
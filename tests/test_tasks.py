@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+from app import tasks
+from app.celery_app import CELERY_OCR_TIME_LIMIT
+from app.models import Document, User
+from app.tasks import OCR_MAX_ATTEMPTS, _claim_documents, requeue_stale_documents
+
+STALE = datetime.now() - timedelta(seconds=CELERY_OCR_TIME_LIMIT + 60)
+
+
+@pytest.fixture(params=[True, False], ids=["returning", "rowcount"])
+def engine(request, monkeypatch):
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(engine.dialect, "update_returning", request.param)
+    monkeypatch.setattr(tasks, "get_engine", lambda: engine)
+    with Session(engine) as session:
+        session.add(
+            User(id=1, email="a@b.c", password_hash="x", full_name="A", cnpj="")
+        )
+        session.commit()
+    return engine
+
+
+def _add(engine, document_id: int, **fields):
+    with Session(engine) as session:
+        session.add(
+            Document(
+                id=document_id,
+                user_id=1,
+                filename=f"{document_id}.png",
+                minio_path=f"1/{document_id}.png",
+                file_size=1,
+                content_type="image/png",
+                **fields,
+            )
+        )
+        session.commit()
+
+
+def _claim(engine, document_ids: list[int]) -> list[int]:
+    with Session(engine) as session:
+        claimed = [row[0] for row in _claim_documents(session, document_ids)]
+        session.commit()
+    return sorted(claimed)
+
+
+def _document(engine, document_id: int) -> Document:
+    with Session(engine) as session:
+        return session.get(Document, document_id)
+
+
+def test_pending_document_is_claimed_once(engine):
+    _add(engine, 1)
+    assert _claim(engine, [1]) == [1]
+    document = _document(engine, 1)
+    assert document.status == "processing"
+    assert document.ocr_attempts == 1
+    assert document.claimed_at is not None
+    assert _claim(engine, [1]) == []
+    assert _document(engine, 1).ocr_attempts == 1
+
+
+def test_only_stale_claims_are_reclaimed(engine):
+    _add(engine, 1, status="processing", claimed_at=STALE, ocr_attempts=1)
+    _add(engine, 2, status="processing", claimed_at=datetime.now(), ocr_attempts=1)
+    _add(engine, 3, status="processing", claimed_at=None, ocr_attempts=None)
+    assert _claim(engine, [1, 2, 3]) == [1, 3]
+    assert _document(engine, 1).ocr_attempts == 2
+    assert _document(engine, 1).claimed_at > STALE
+    assert _document(engine, 3).ocr_attempts == 1
+
+
+def test_exhausted_document_is_failed_and_not_requeued(engine, monkeypatch):
+    queued = []
+    monkeypatch.setattr(tasks.process_documents_ocr_batch, "delay", queued.append)
+    _add(
+        engine,
+        1,
+        status="processing",
+        claimed_at=STALE,
+        ocr_attempts=OCR_MAX_ATTEMPTS,
+    )
+    _add(engine, 2, status="processing", claimed_at=STALE, ocr_attempts=1)
+    _add(engine, 3, status="processing", claimed_at=datetime.now(), ocr_attempts=1)
+    requeue_stale_documents()
+    assert queued == [[2]]
+    assert _document(engine, 1).status == "failed"
+    assert _document(engine, 2).status == "processing"
+    assert _claim(engine, [1, 2]) == [2]
+    with Session(engine) as session:
+        statuses = dict(session.exec(select(Document.id, Document.status)).all())
+    assert statuses == {1: "failed", 2: "processing", 3: "processing"}
\ No newline at end of file